@@ -1,31 +1,48 @@
 """Configuration settings for RiffRag using Pydantic."""
 
+from collections.abc import Iterable
+from functools import cache, cached_property
 from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+if TYPE_CHECKING:
+    from src.utils.exclude_matcher import ExcludeMatcher
+
 
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
 
     model_config = SettingsConfigDict(
-        env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore"
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+        defer_build=True,
     )
 
     # Paths
     project_root: Path = Field(
-        default_factory=lambda: Path(__file__).parent.parent, description="Project root directory"
+        default_factory=lambda: Path(__file__).resolve().parent.parent,
+        description="Project root directory",
     )
 
+    @field_validator("project_root")
+    @classmethod
+    def _resolve_project_root(cls, value: Path) -> Path:
+        """Resolve the project root once so later CWD changes can't affect it."""
+        return value.resolve()
+
     @property
     def data_dir(self) -> Path:
         """Data directory path."""
         return self.project_root / "data"
 
-    @property
+    @cached_property
     def database_dir(self) -> Path:
-        """Database storage directory."""
+        """Database storage directory (created on first access)."""
         path = self.data_dir / "databases"
         path.mkdir(parents=True, exist_ok=True)
         return path
@@ -42,6 +59,11 @@ class Settings(BaseSettings):
         description="Embedding vector dimension (nomic-embed-text = 768, mxbai-embed-large = 1024)",
     )
 
+    vector_dtype: Literal["float32", "float16"] = Field(
+        default="float32",
+        description="Precision of vectors in newly created tables (float16 halves their size)",
+    )
+
     use_embedding_prefixes: bool = Field(
         default=False,
         description="Use search_query/search_document prefixes (required for nomic-embed-text, disable for mxbai-embed-large)",
@@ -54,8 +76,46 @@ class Settings(BaseSettings):
 
     batch_size: int = Field(default=10, description="Number of files to embed in a batch")
 
-    default_exclude_patterns: list[str] = Field(
-        default=[
+    auto_batch_size: bool = Field(
+        default=True,
+        description="Probe Ollama latency to pick embed_request_size when it isn't set explicitly",
+    )
+
+    batch_latency_slo_ms: float = Field(
+        default=2000, description="Maximum p95 latency per embedding batch when auto-tuning"
+    )
+
+    chunk_workers: int = Field(
+        default=0,
+        description="Processes reading and chunking files (0 = one per CPU, 1 = no worker processes)",
+    )
+
+    embed_request_size: int = Field(
+        default=64, description="Maximum number of texts sent to Ollama in one embed request"
+    )
+
+    embed_parallelism: int = Field(
+        default=4,
+        description="Concurrent embed requests sent to Ollama",
+    )
+
+    use_embedding_cache: bool = Field(
+        default=True,
+        description="Reuse embeddings of unchanged chunks and repeated queries (stored in state_dir)",
+    )
+
+    embedding_cache_dtype: Literal["float32", "float16", "int8"] = Field(
+        default="float16",
+        description="Precision of cached embeddings (int8 stores a per-vector scale)",
+    )
+
+    @property
+    def embed_request_size_is_explicit(self) -> bool:
+        """Whether embed_request_size was configured (env/.env) rather than defaulted."""
+        return "embed_request_size" in self.model_fields_set
+
+    default_exclude_patterns: tuple[str, ...] = Field(
+        default=(
             "*.pyc",
             "__pycache__",
             ".git",
@@ -79,32 +139,118 @@ class Settings(BaseSettings):
             "*.db",
             "*.sqlite",
             "*.sqlite3",
-        ],
+        ),
         description="Default file patterns to exclude from indexing",
     )
 
+    @cached_property
+    def exclude_matcher(self) -> "ExcludeMatcher":
+        """Compiled matcher for the default exclude patterns."""
+        from src.utils.exclude_matcher import ExcludeMatcher
+
+        return ExcludeMatcher(self.default_exclude_patterns)
+
+    def combined_exclude(self, extra: Iterable[str] = ()) -> "ExcludeMatcher":
+        """Compile the default exclude patterns together with additional ones.
+
+        Args:
+            extra: Additional patterns to exclude (e.g. from --exclude)
+
+        Returns:
+            Compiled matcher covering default and additional patterns
+        """
+        from src.utils.exclude_matcher import ExcludeMatcher
+
+        extra = list(extra)
+        if not extra:
+            return self.exclude_matcher
+        return ExcludeMatcher((*self.default_exclude_patterns, *extra))
+
     # Querying settings
     default_search_limit: int = Field(
         default=5, description="Default number of search results to return"
     )
 
+    query_workers: int = Field(
+        default=4, description="Threads running QueryEngine.aquery calls concurrently"
+    )
+
+    query_embedding_cache_size: int = Field(
+        default=1024, description="Query embeddings kept in memory for repeated questions"
+    )
+
+    ann_index_min_rows: int = Field(
+        default=50000,
+        description="Chunks at which an ANN vector index is built after indexing (0 = never)",
+    )
+
+    ann_nprobes: int = Field(
+        default=20, description="IVF partitions searched per query when the table has an ANN index"
+    )
+
+    ann_refine_factor: int = Field(
+        default=10,
+        description="Re-rank limit x this many ANN candidates by exact distance (0 = off)",
+    )
+
     similarity_threshold: float = Field(
         default=0.001, description="Minimum similarity score threshold (0-1)"
     )
 
+    enable_semantic_cache: bool = Field(
+        default=False,
+        description="Reuse results of identical or near-identical earlier queries (state_dir)",
+    )
+
+    semantic_cache_threshold: float = Field(
+        default=0.97, description="Cosine similarity at which an earlier query counts as the same"
+    )
+
+    semantic_cache_ttl_seconds: float = Field(
+        default=3600, description="Age after which cached query results are ignored"
+    )
+
+    semantic_cache_memory_entries: int = Field(
+        default=256, description="Query results also kept in memory per process (0 = none)"
+    )
+
     # Skill settings
-    @property
+    @cached_property
     def skill_output_dir(self) -> Path:
-        """Claude Code skills directory."""
+        """Claude Code skills directory (created on first access)."""
         path = Path.home() / ".claude" / "skills"
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    # Query daemon settings
+    state_dir: Path = Field(
+        default_factory=lambda: Path.home() / ".riffrag",
+        description="Per-user runtime state directory (sockets, caches)",
+    )
+
+    @property
+    def query_socket_path(self) -> Path:
+        """Unix socket the query daemon listens on."""
+        return self.state_dir / "query.sock"
+
     # Logging
     log_level: str = Field(
         default="INFO", description="Logging level (DEBUG, INFO, WARNING, ERROR)"
     )
 
 
-# Global settings instance
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    """Get the shared settings instance, building it on first use.
+
+    Returns:
+        Cached Settings instance
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    """Lazily provide the module-level ``settings`` instance."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
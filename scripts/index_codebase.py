@@ -9,24 +9,29 @@ from typing import Optional
 import typer
 from rich.console import Console
 from rich.logging import RichHandler
-from rich.panel import Panel
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config.settings import settings
+from config.settings import get_settings
+from src.embeddings.ollama_embedder import probe_dimension
 from src.indexing.indexer import index_codebase
+from src.utils.cli_output import print_banner
 
-# Setup logging
-logging.basicConfig(
-    level=settings.log_level, format="%(message)s", handlers=[RichHandler(rich_tracebacks=True)]
-)
 logger = logging.getLogger(__name__)
 
 app = typer.Typer(help="Index a codebase into RAG database")
 console = Console()
 
 
+def _describe_embed_request_size() -> str:
+    """Describe the number of chunks sent to Ollama per embed request."""
+    settings = get_settings()
+    if settings.auto_batch_size and not settings.embed_request_size_is_explicit:
+        return "auto"
+    return str(settings.embed_request_size)
+
+
 @app.command()
 def main(
     path: Path = typer.Option(
@@ -54,12 +59,12 @@ def main(
     max_file_size: Optional[int] = typer.Option(
         None,
         "--max-file-size",
-        help=f"Maximum file size in bytes (default: {settings.max_file_size_bytes})",
+        help="Maximum file size in bytes (default: MAX_FILE_SIZE_BYTES setting)",
     ),
     batch_size: Optional[int] = typer.Option(
         None,
         "--batch-size",
-        help=f"Number of files to process in a batch (default: {settings.batch_size})",
+        help="Number of files to process in a batch (default: BATCH_SIZE setting)",
     ),
     no_progress: bool = typer.Option(
         False,
@@ -75,23 +80,33 @@ def main(
             --name my-project \\
             --exclude "*.log,*.tmp"
     """
-    # Get actual embedding dimension (auto-detected or manual)
-    from src.embeddings.ollama_embedder import OllamaEmbedder
-
-    temp_embedder = OllamaEmbedder()
-    actual_dimension = temp_embedder.dimension
-
-    console.print(
-        Panel.fit(
-            f"[bold cyan]Indexing Codebase[/bold cyan]\n\n"
-            f"[yellow]Path:[/yellow] {path}\n"
-            f"[yellow]Name:[/yellow] {name}\n"
-            f"[yellow]Database:[/yellow] {settings.database_dir / (name + '_rag')}\n"
-            f"[yellow]Model:[/yellow] {settings.embedding_model}\n"
-            f"[yellow]Dimensions:[/yellow] {actual_dimension}\n"
-            f"[yellow]Batch size:[/yellow] {batch_size or settings.batch_size}",
-            border_style="cyan",
-        )
+    settings = get_settings()
+
+    # Setup logging
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(message)s",
+        handlers=[RichHandler(rich_tracebacks=True)],
+    )
+
+    # Resolve defaults now that arguments are parsed
+    max_file_size = max_file_size or settings.max_file_size_bytes
+
+    # Get actual embedding dimension (auto-detected or manual, cached per model)
+    actual_dimension = probe_dimension()
+
+    print_banner(
+        console,
+        "Indexing Codebase",
+        [
+            ("Path", path),
+            ("Name", name),
+            ("Database", settings.database_dir / (name + "_rag")),
+            ("Model", settings.embedding_model),
+            ("Dimensions", actual_dimension),
+            ("Batch size", batch_size or settings.batch_size),
+            ("Embed request size", _describe_embed_request_size()),
+        ],
     )
 
     # Parse exclude patterns
@@ -109,6 +124,7 @@ def main(
             max_file_size=max_file_size,
             batch_size=batch_size,
             show_progress=not no_progress,
+            exclude_matcher=settings.combined_exclude(additional_exclude or []),
         )
 
         # Display results
@@ -116,18 +132,19 @@ def main(
         speed = stats["files_processed"] / duration if duration > 0 else 0
 
         console.print("\n")
-        console.print(
-            Panel.fit(
-                f"[bold green]Indexing Complete![/bold green]\n\n"
-                f"[yellow]Total files found:[/yellow] {stats['total_files_found']}\n"
-                f"[yellow]Files processed:[/yellow] {stats['files_processed']}\n"
-                f"[yellow]Files skipped:[/yellow] {stats['files_skipped']}\n"
-                f"[yellow]Files failed:[/yellow] {stats['files_failed']}\n"
-                f"[yellow]Chunks created:[/yellow] {stats['chunks_created']}\n"
-                f"[yellow]Duration:[/yellow] {duration:.2f} seconds\n"
-                f"[yellow]Speed:[/yellow] {speed:.2f} files/sec",
-                border_style="green",
-            )
+        print_banner(
+            console,
+            "Indexing Complete!",
+            [
+                ("Total files found", stats["total_files_found"]),
+                ("Files processed", stats["files_processed"]),
+                ("Files skipped", stats["files_skipped"]),
+                ("Files failed", stats["files_failed"]),
+                ("Chunks created", stats["chunks_created"]),
+                ("Duration", f"{duration:.2f} seconds"),
+                ("Speed", f"{speed:.2f} files/sec"),
+            ],
+            style="green",
         )
 
         console.print(
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""RiffRag - Keep a warm query server running for Claude Code skills."""
+
+import logging
+import os
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+import typer
+from rich.console import Console
+from rich.logging import RichHandler
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import get_settings
+from src.embeddings.ollama_embedder import OllamaEmbedder
+from src.querying.query_engine import QueryEngine
+from src.storage.lancedb_store import LanceDBStore
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer(help="Serve RAG queries over a Unix socket")
+console = Console()
+
+
+class QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server holding one warm embedder and store for all databases."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, embedder: OllamaEmbedder, store: LanceDBStore):
+        """Initialize query server.
+
+        Args:
+            socket_path: Path of the Unix socket to listen on
+            embedder: Shared embedder instance
+            store: Shared store instance
+        """
+        self.embedder = embedder
+        self.store = store
+        self._engines: dict[str, QueryEngine] = {}
+        self._engines_lock = threading.Lock()
+        super().__init__(str(socket_path), QueryRequestHandler)
+
+    def get_engine(self, database: str) -> QueryEngine:
+        """Get (or create) the query engine for a database.
+
+        Args:
+            database: Name of the codebase database
+
+        Returns:
+            QueryEngine sharing this server's embedder and store
+        """
+        with self._engines_lock:
+            engine = self._engines.get(database)
+            if engine is None:
+                engine = QueryEngine(database, embedder=self.embedder, store=self.store)
+                self._engines[database] = engine
+            return engine
+
+    def server_close(self):
+        """Close the socket and the engines' query caches."""
+        super().server_close()
+        with self._engines_lock:
+            for engine in self._engines.values():
+                engine.close()
+
+
+class QueryRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one query per connection.
+
+    The request is a single line: ``<database>\\t<limit>\\t<query>``. The
+    response is the machine-formatted result text, after which the connection
+    is closed.
+    """
+
+    def handle(self):
+        """Read the request line and write back formatted results."""
+        line = self.rfile.readline().decode("utf-8", errors="replace").rstrip("\n")
+        parts = line.split("\t", 2)
+        if len(parts) != 3:
+            self._reply("Error: expected '<database>\\t<limit>\\t<query>'\n")
+            return
+
+        database, limit, query = parts
+        try:
+            engine = self.server.get_engine(database)
+            results = engine.query(
+                query_text=query,
+                limit=int(limit) if limit else None,
+                format_style="machine",
+            )
+            self._reply(engine.format_results(results, style="machine") + "\n")
+        except Exception as e:
+            logger.exception("Query failed")
+            self._reply(f"Error: {e}\n")
+
+    def _reply(self, text: str):
+        """Write a response to the client."""
+        self.wfile.write(text.encode("utf-8"))
+
+
+@app.command()
+def main(
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        "-s",
+        help="Unix socket path (default: ~/.riffrag/query.sock)",
+    ),
+):
+    """Run the query daemon used by generated Claude Code skills.
+
+    Example:
+        python scripts/query_daemon.py
+    """
+    settings = get_settings()
+
+    # Setup logging
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(message)s",
+        handlers=[RichHandler(rich_tracebacks=True)],
+    )
+
+    socket_path = socket_path or settings.query_socket_path
+    socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    # Remove a stale socket left behind by a previous run
+    if socket_path.is_socket():
+        socket_path.unlink()
+
+    embedder = OllamaEmbedder()
+    store = LanceDBStore()
+
+    # Warm up the model so the first real question doesn't pay for loading it
+    try:
+        embedder.warmup()
+    except RuntimeError as e:
+        logger.warning(f"Warm-up embedding failed: {e}")
+
+    server = QueryServer(socket_path, embedder, store)
+    os.chmod(socket_path, 0o600)
+
+    console.print(f"[green]✓[/green] Query daemon listening on: {socket_path}")
+    console.print("Press Ctrl+C to stop")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Query daemon stopped[/yellow]")
+    finally:
+        server.server_close()
+        embedder.close()
+        socket_path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    app()
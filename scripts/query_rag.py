@@ -3,26 +3,23 @@
 
 import logging
 import sys
+import threading
 from pathlib import Path
 from typing import Optional
 
 import typer
 from rich.console import Console
 from rich.logging import RichHandler
-from rich.markdown import Markdown
-from rich.panel import Panel
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config.settings import settings
+from config.settings import get_settings
+from src.embeddings.ollama_embedder import OllamaEmbedder
 from src.querying.query_engine import QueryEngine
 from src.storage.lancedb_store import LanceDBStore
+from src.utils.cli_output import print_banner
 
-# Setup logging
-logging.basicConfig(
-    level=settings.log_level, format="%(message)s", handlers=[RichHandler(rich_tracebacks=True)]
-)
 logger = logging.getLogger(__name__)
 
 app = typer.Typer(help="Query a RAG database")
@@ -47,7 +44,7 @@ def main(
         None,
         "--limit",
         "-l",
-        help=f"Maximum number of results (default: {settings.default_search_limit})",
+        help="Maximum number of results (default: DEFAULT_SEARCH_LIMIT setting)",
     ),
     format_style: str = typer.Option(
         "human",
@@ -64,13 +61,28 @@ def main(
     min_similarity: Optional[float] = typer.Option(
         None,
         "--min-similarity",
-        help=f"Minimum similarity threshold 0-1 (default: {settings.similarity_threshold})",
+        help="Minimum similarity threshold 0-1 (default: SIMILARITY_THRESHOLD setting)",
     ),
     list_databases: bool = typer.Option(
         False,
         "--list",
         help="List all available databases",
     ),
+    nprobes: Optional[int] = typer.Option(
+        None,
+        "--nprobes",
+        help="ANN index partitions searched (default: ANN_NPROBES setting)",
+    ),
+    refine_factor: Optional[int] = typer.Option(
+        None,
+        "--refine-factor",
+        help="Re-rank limit x N ANN candidates exactly, 0 = off (default: ANN_REFINE_FACTOR setting)",
+    ),
+    no_embed_cache: bool = typer.Option(
+        False,
+        "--no-embed-cache",
+        help="Always ask Ollama for the query embedding instead of the embedding cache",
+    ),
 ):
     """Query a RAG database with natural language.
 
@@ -81,32 +93,40 @@ def main(
             --limit 5 \\
             --format machine
     """
+    settings = get_settings()
+
+    # Machine output is read by Claude, not people: skip Rich rendering entirely
+    machine = format_style == "machine"
+
+    # Setup logging (plain stderr for machine output so stdout stays clean)
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(message)s",
+        handlers=[logging.StreamHandler() if machine else RichHandler(rich_tracebacks=True)],
+    )
+
     # Handle list databases
     if list_databases:
         store = LanceDBStore()
-        databases = store.list_tables()
+        all_stats = store.list_tables_with_stats()
 
-        if not databases:
+        if not all_stats:
             console.print("[yellow]No databases found[/yellow]")
             return
 
-        console.print(
-            Panel.fit(
-                "[bold cyan]Available Databases[/bold cyan]\n\n"
-                + "\n".join(f"  • {db}" for db in databases),
-                border_style="cyan",
-            )
+        print_banner(
+            console,
+            "Available Databases",
+            [(None, f"  • {stats['codebase_name']}") for stats in all_stats],
         )
 
         # Show stats for each database
         console.print("\n[bold]Database Statistics:[/bold]\n")
-        for db in databases:
-            stats = store.get_stats(db)
-            if stats:
-                console.print(f"[cyan]{db}[/cyan]:")
-                console.print(f"  Files: {stats['total_files']}")
-                console.print(f"  Extensions: {list(stats['extension_distribution'].keys())}")
-                console.print()
+        for stats in all_stats:
+            console.print(f"[cyan]{stats['codebase_name']}[/cyan]:")
+            console.print(f"  Files: {stats['total_files']}")
+            console.print(f"  Extensions: {list(stats['extension_distribution'].keys())}")
+            console.print()
 
         return
 
@@ -121,29 +141,39 @@ def main(
         sys.exit(1)
 
     # Validate database exists
-    store = LanceDBStore()
+    store = LanceDBStore(nprobes=nprobes, refine_factor=refine_factor)
     if not store.table_exists(database):
         console.print(f"[bold red]Error:[/bold red] Database '{database}' does not exist")
         console.print(f"\nAvailable databases: {store.list_tables()}")
         console.print("\nRun with --list to see all databases")
         sys.exit(1)
 
+    # Resolve defaults now that arguments are parsed
+    if limit is None:
+        limit = settings.default_search_limit
+    if min_similarity is None:
+        min_similarity = settings.similarity_threshold
+
+    # Start loading the model in Ollama while the banner renders
+    embedder = OllamaEmbedder(use_cache=False) if no_embed_cache else None
+    engine = QueryEngine(database, embedder=embedder, store=store)
+    threading.Thread(target=engine.warmup, daemon=True).start()
+
     # Display query info
-    console.print(
-        Panel.fit(
-            f"[bold cyan]Querying RAG Database[/bold cyan]\n\n"
-            f"[yellow]Database:[/yellow] {database}\n"
-            f"[yellow]Query:[/yellow] {query}\n"
-            f"[yellow]Limit:[/yellow] {limit or settings.default_search_limit}\n"
-            f"[yellow]Format:[/yellow] {format_style}",
-            border_style="cyan",
+    if not machine:
+        print_banner(
+            console,
+            "Querying RAG Database",
+            [
+                ("Database", database),
+                ("Query", query),
+                ("Limit", limit),
+                ("Format", format_style),
+            ],
         )
-    )
 
     # Run query
     try:
-        engine = QueryEngine(database)
-
         results = engine.query(
             query_text=query,
             limit=limit,
@@ -153,6 +183,9 @@ def main(
         )
 
         if not results:
+            if machine:
+                sys.stdout.write("No results found.\n")
+                return
             console.print("\n[yellow]No results found matching your query.[/yellow]")
             console.print("\nTips:")
             console.print("  • Try a more general query")
@@ -163,12 +196,12 @@ def main(
         # Format and display results
         formatted = engine.format_results(results, style=format_style)
 
+        if machine:
+            sys.stdout.write(formatted + "\n")
+            return
+
         console.print("\n")
-        if format_style == "machine":
-            # Render as markdown for machine format
-            console.print(Markdown(formatted))
-        else:
-            console.print(formatted)
+        console.print(formatted)
 
         # Show summary
         console.print(f"\n[green]✓[/green] Found {len(results)} relevant files")
@@ -0,0 +1,148 @@
+"""Skill file generation, kept free of CLI and database imports."""
+
+import logging
+import shlex
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# SKILL.md template, compiled once at import
+SKILL_TEMPLATE = Template("""---
+name: $skill_name
+description: Free locally-hosted RAG for $codebase_name. Use for finding code, patterns, and documentation. Prefer this over the Explore agent for questions about this codebase.
+---
+
+$description
+
+**When to use:**
+- Finding code patterns or implementations
+- Locating specific functions, classes, or features
+- Understanding how something works
+- **Prefer this over Explore agent** - it's free and faster
+
+**How it works:**
+Semantic search of the codebase returns relevant code chunks with line numbers and similarity scores. If results are unclear, escalate to targeted Grep/Glob searches or the Explore agent.
+
+---
+```bash
+python3 $query_script "$$*"
+```
+""")
+
+# query.py written next to SKILL.md. Standard library only, so it starts fast:
+# ask the warm query daemon if it's running, otherwise run query_rag.py.
+QUERY_SCRIPT_TEMPLATE = Template('''#!/usr/bin/env python3
+"""Query the $database_label RAG database (generated by RiffRag)."""
+
+import os
+import socket
+import sys
+
+PROJECT_ROOT = $project_root
+SOCKET_PATH = $socket_path
+DATABASE = $database_name
+LIMIT = $limit
+
+
+def main():
+    query = " ".join(sys.argv[1:]).replace("\\n", " ")
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(SOCKET_PATH)
+            sock.sendall(f"{DATABASE}\\t{LIMIT}\\t{query}\\n".encode("utf-8"))
+            while chunk := sock.recv(65536):
+                sys.stdout.buffer.write(chunk)
+        return
+    except OSError:
+        pass  # Daemon not running, fall back to a one-off query
+
+    python = os.path.join(PROJECT_ROOT, "venv", "bin", "python3")
+    if not os.path.exists(python):
+        python = sys.executable
+
+    os.chdir(PROJECT_ROOT)
+    os.execv(
+        python,
+        [
+            python,
+            os.path.join(PROJECT_ROOT, "scripts", "query_rag.py"),
+            "--database",
+            DATABASE,
+            "--query",
+            query,
+            "--limit",
+            str(LIMIT),
+            "--format",
+            "machine",
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
+''')
+
+
+def generate_skill(
+    database_name: str,
+    skill_name: Optional[str] = None,
+    description: Optional[str] = None,
+    codebase_name: Optional[str] = None,
+    output_dir: Optional[Path] = None,
+) -> Path:
+    """Generate a Claude Code skill for a RAG database.
+
+    Args:
+        database_name: Name of the RAG database
+        skill_name: Name for the skill (default: {database_name}-rag)
+        description: Skill description
+        codebase_name: Codebase name(s) for the skill (default: database_name)
+        output_dir: Output directory (default: ~/.claude/skills)
+
+    Returns:
+        Path to created skill directory
+    """
+    # Set defaults
+    skill_name = skill_name or f"{database_name}-rag"
+    codebase_name = codebase_name or database_name
+    description = description or f"Query the {database_name} codebase using RAG"
+    settings = get_settings()
+    output_dir = output_dir or settings.skill_output_dir
+
+    # Create skill directory
+    skill_dir = output_dir / skill_name
+    skill_dir.mkdir(parents=True, exist_ok=True)
+
+    # Write the query helper the skill runs
+    query_script = skill_dir / "query.py"
+    query_script.write_text(
+        QUERY_SCRIPT_TEMPLATE.substitute(
+            project_root=repr(str(settings.project_root)),
+            socket_path=repr(str(settings.query_socket_path)),
+            database_name=repr(database_name),
+            database_label=database_name,
+            limit=settings.default_search_limit,
+        ),
+        encoding="utf-8",
+    )
+    query_script.chmod(0o755)
+
+    # Create SKILL.md file (uppercase as required by Claude Code)
+    skill_file = skill_dir / "SKILL.md"
+    skill_file.write_text(
+        SKILL_TEMPLATE.substitute(
+            skill_name=skill_name,
+            codebase_name=codebase_name,
+            description=description,
+            query_script=shlex.quote(str(query_script)),
+        ),
+        encoding="utf-8",
+    )
+
+    logger.info(f"Created skill at: {skill_file}")
+    return skill_dir
@@ -12,7 +12,7 @@ from rich.console import Console
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config.settings import settings
+from skills._core import generate_skill
 from src.storage.lancedb_store import LanceDBStore
 
 logger = logging.getLogger(__name__)
@@ -20,73 +20,6 @@ console = Console()
 app = typer.Typer(help="Generate Claude Code skills for RAG databases")
 
 
-def generate_skill(
-    database_name: str,
-    skill_name: Optional[str] = None,
-    description: Optional[str] = None,
-    codebase_name: Optional[str] = None,
-    output_dir: Optional[Path] = None,
-) -> Path:
-    """Generate a Claude Code skill for a RAG database.
-
-    Args:
-        database_name: Name of the RAG database
-        skill_name: Name for the skill (default: {database_name}-rag)
-        description: Skill description
-        codebase_name: Codebase name(s) for the skill (default: database_name)
-        output_dir: Output directory (default: ~/.claude/skills)
-
-    Returns:
-        Path to created skill directory
-    """
-    # Set defaults
-    skill_name = skill_name or f"{database_name}-rag"
-    codebase_name = codebase_name or database_name
-    description = description or f"Query the {database_name} codebase using RAG"
-    output_dir = output_dir or settings.skill_output_dir
-
-    # Get absolute path to this project
-    project_root = Path(__file__).parent.parent.absolute()
-
-    # Create skill directory
-    skill_dir = output_dir / skill_name
-    skill_dir.mkdir(parents=True, exist_ok=True)
-
-    # Create SKILL.md file (uppercase as required by Claude Code)
-    skill_file = skill_dir / "SKILL.md"
-
-    skill_content = f"""---
-name: {skill_name}
-description: Free locally-hosted RAG for {codebase_name}. Use for finding code, patterns, and documentation. Prefer this over the Explore agent for questions about this codebase.
----
-
-{description}
-
-**When to use:**
-- Finding code patterns or implementations
-- Locating specific functions, classes, or features
-- Understanding how something works
-- **Prefer this over Explore agent** - it's free and faster
-
-**How it works:**
-Semantic search of the codebase returns relevant code chunks with line numbers and similarity scores. If results are unclear, escalate to targeted Grep/Glob searches or the Explore agent.
-
----
-```bash
-#!/usr/bin/env bash
-cd {project_root}
-just query {database_name} "$*" --limit {settings.default_search_limit} --format machine
-```
-"""
-
-    # Write skill file
-    with open(skill_file, "w", encoding="utf-8") as f:
-        f.write(skill_content)
-
-    logger.info(f"Created skill at: {skill_file}")
-    return skill_dir
-
-
 @app.command()
 def create(
     database: str = typer.Option(
@@ -128,9 +61,9 @@ def create(
     # Handle list databases
     if list_databases:
         store = LanceDBStore()
-        databases = store.list_tables()
+        all_stats = store.list_tables_with_stats()
 
-        if not databases:
+        if not all_stats:
             console.print("[yellow]No databases found[/yellow]")
             console.print("\nCreate a database first:")
             console.print(
@@ -139,11 +72,9 @@ def create(
             return
 
         console.print("[bold cyan]Available Databases:[/bold cyan]\n")
-        for db in databases:
-            stats = store.get_stats(db)
-            console.print(f"  • [cyan]{db}[/cyan]")
-            if stats:
-                console.print(f"    Files: {stats['total_files']}")
+        for stats in all_stats:
+            console.print(f"  • [cyan]{stats['codebase_name']}[/cyan]")
+            console.print(f"    Files: {stats['total_files']}")
         return
 
     # Verify database exists
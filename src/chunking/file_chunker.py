@@ -1,22 +1,110 @@
 """File chunking module - reads files and extracts metadata."""
 
+import codecs
 import logging
 import mimetypes
+import multiprocessing
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from collections import ChainMap
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import chardet
+import numpy as np
 
-from config.settings import settings
+from config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Bytes scanned for binary markers; bytes.find/translate are C loops, so 64KB is cheap
+BINARY_PROBE_BYTES = 65536
+
+# ASCII control bytes other than tab, newline, form feed and carriage return
+CONTROL_BYTES = bytes(b for b in range(0x20) if b not in b"\t\n\f\r")
+
+# Files whose probe is more than this fraction control bytes are treated as binary
+BINARY_CONTROL_RATIO = 0.3
+
+# Binary-check results remembered per FileChunker (oldest evicted first)
+BINARY_CACHE_SIZE = 32768
+
+# Files sent to a chunking worker per task (amortizes the pickling round-trip)
+CHUNK_TASK_FILES = 8
+
+
+def _is_utf8_sample(sample: bytes) -> bool:
+    """Check if a sample is ASCII or valid UTF-8, tolerating a truncated last character.
+
+    Args:
+        sample: Bytes from the start of a file
+
+    Returns:
+        True if the sample decodes as UTF-8
+    """
+    if sample.isascii():
+        return True
+    try:
+        # Incremental decoder: a multi-byte character cut off at the end isn't an error
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+# FileChunker owned by each chunking worker process (see chunk_pool)
+_worker_chunker: Optional["FileChunker"] = None
+
+
+def _init_chunk_worker(max_file_size: int, max_chunk_tokens: Optional[int]) -> None:
+    """Create the per-process FileChunker used by _chunk_in_worker."""
+    global _worker_chunker
+    _worker_chunker = FileChunker(max_file_size, max_chunk_tokens=max_chunk_tokens)
+
+
+def _chunk_in_worker(args: tuple[Path, Path]) -> tuple[Path, list[ChainMap]]:
+    """Chunk one file in a worker process.
+
+    Args:
+        args: Tuple of (file path, codebase root)
+
+    Returns:
+        Tuple of (file path, chunks) so unordered results can be matched up
+    """
+    file_path, codebase_root = args
+    return file_path, _worker_chunker.chunk_file(file_path, codebase_root)
+
+
+def default_chunk_workers() -> int:
+    """Number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@lru_cache(maxsize=128)
+def _chardet_detect(sample: bytes) -> tuple[Optional[str], float]:
+    """Run chardet on a sample, caching results for identical samples.
+
+    Args:
+        sample: Bytes from the start of a file
+
+    Returns:
+        Tuple of (detected encoding or None, confidence)
+    """
+    result = chardet.detect(sample)
+    return result.get("encoding"), result.get("confidence", 0)
+
 
 class FileChunker:
     """Chunk files by reading entire files with metadata."""
 
-    # Common code file extensions
+    # Common code file extensions (keys lowercase; lookups lowercase the suffix)
     CODE_EXTENSIONS = {
         ".py": "python",
         ".js": "javascript",
@@ -43,7 +131,6 @@ class FileChunker:
         ".zsh": "shell",
         ".fish": "shell",
         ".r": "r",
-        ".R": "r",
         ".m": "matlab",
         ".sql": "sql",
         ".html": "html",
@@ -68,6 +155,13 @@ class FileChunker:
         ".svelte": "svelte",
     }
 
+    # Language names indexed by small integer ids ('unknown' is 0), interned once
+    LANGUAGES = tuple(map(sys.intern, ["unknown", *sorted(set(CODE_EXTENSIONS.values()))]))
+    LANGUAGE_IDS = {name: language_id for language_id, name in enumerate(LANGUAGES)}
+    EXTENSION_LANGUAGE_IDS = dict(
+        zip(CODE_EXTENSIONS, map(LANGUAGE_IDS.__getitem__, CODE_EXTENSIONS.values()))
+    )
+
     def __init__(self, max_file_size: int = None, max_chunk_tokens: int = None):
         """Initialize file chunker.
 
@@ -75,9 +169,106 @@ class FileChunker:
             max_file_size: Maximum file size in bytes (default from settings)
             max_chunk_tokens: Maximum tokens per chunk for embedding (default: auto-detect from model)
         """
-        self.max_file_size = max_file_size or settings.max_file_size_bytes
+        self.max_file_size = max_file_size or get_settings().max_file_size_bytes
         self.max_chunk_tokens = max_chunk_tokens  # Will be set by indexer if needed
 
+        # (st_dev, st_ino, st_size, st_mtime_ns) -> is binary; a changed file gets a new key
+        self._binary_cache: dict[tuple[int, int, int, int], bool] = {}
+
+    @property
+    def max_chunk_tokens(self) -> Optional[int]:
+        """Maximum tokens per chunk, or None for no limit."""
+        return self._max_chunk_tokens
+
+    @max_chunk_tokens.setter
+    def max_chunk_tokens(self, value: Optional[int]):
+        self._max_chunk_tokens = value
+        # Very conservative estimate for code: 1 token ≈ 1.5 characters
+        # Use 70% of limit to leave safety margin
+        self._max_chars = int(value * 1.5 * 0.7) if value else None
+
+    @staticmethod
+    def _probe(
+        file_path: Path,
+        stats: Optional[os.stat_result] = None,
+        max_bytes: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> tuple[os.stat_result, bytes]:
+        """Open a file once, stat it and read it.
+
+        The size check, binary probe, encoding detection and final decode all
+        work from this single open/fstat/read instead of re-opening the file.
+        The file is read with os.read rather than mapped: touching a mapping of
+        a file truncated in the meantime raises SIGBUS, which kills the process.
+
+        Args:
+            file_path: Path to file
+            stats: Stat result the caller already has (skips the fstat)
+            max_bytes: Read at most this many bytes from the start (default: all)
+            max_size: Don't read files larger than this (their contents are empty)
+
+        Returns:
+            Tuple of (stat result, file contents). Reading stops at the size the
+            file had when stat'ed, or earlier if it has since been truncated.
+        """
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            if stats is None:
+                stats = os.fstat(fd)
+            remaining = stats.st_size
+            if max_size is not None and remaining > max_size:
+                return stats, b""
+            if max_bytes is not None:
+                remaining = min(remaining, max_bytes)
+
+            parts = []
+            while remaining > 0:
+                part = os.read(fd, remaining)
+                if not part:
+                    break
+                parts.append(part)
+                remaining -= len(part)
+            return stats, b"".join(parts)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _has_text_mime_type(file_path: Path) -> bool:
+        """Check if the file's extension maps to a text/* MIME type."""
+        mime_type, _ = mimetypes.guess_type(str(file_path))
+        return bool(mime_type and mime_type.startswith("text/"))
+
+    @staticmethod
+    def is_binary_bytes(head: bytes) -> bool:
+        """Check if the start of a file looks binary.
+
+        Args:
+            head: First bytes of the file (only the first 64KB are examined)
+
+        Returns:
+            True if binary, False if text
+        """
+        chunk = head[:BINARY_PROBE_BYTES]
+        if not chunk:
+            return False
+
+        # Check for null bytes (binary indicator)
+        if chunk.find(b"\x00") != -1:
+            return True
+
+        # Mostly control characters means binary, whatever the header looked like
+        control_count = len(chunk) - len(chunk.translate(None, CONTROL_BYTES))
+        if control_count > len(chunk) * BINARY_CONTROL_RATIO:
+            return True
+
+        # ASCII/UTF-8 text needs no chardet run
+        if _is_utf8_sample(chunk):
+            return False
+
+        # Try to detect encoding
+        encoding, confidence = _chardet_detect(chunk[:1024])
+        return not (encoding and confidence > 0.7)
+
     @staticmethod
     def is_binary(file_path: Path) -> bool:
         """Check if file is binary.
@@ -89,36 +280,39 @@ class FileChunker:
             True if binary, False if text
         """
         # Check MIME type first
-        mime_type, _ = mimetypes.guess_type(str(file_path))
-        if mime_type and mime_type.startswith("text/"):
+        if FileChunker._has_text_mime_type(file_path):
             return False
 
         # Check by reading first few bytes
         try:
-            with open(file_path, "rb") as f:
-                chunk = f.read(1024)
-                if not chunk:
-                    return False
-
-                # Check for null bytes (binary indicator)
-                if b"\x00" in chunk:
-                    return True
-
-                # Try to decode as text
-                try:
-                    chunk.decode("utf-8")
-                    return False
-                except UnicodeDecodeError:
-                    # Try to detect encoding
-                    result = chardet.detect(chunk)
-                    if result["encoding"] and result["confidence"] > 0.7:
-                        return False
-                    return True
+            _, head = FileChunker._probe(file_path, max_bytes=BINARY_PROBE_BYTES)
+            return FileChunker.is_binary_bytes(head)
 
         except Exception as e:
             logger.warning(f"Error checking if {file_path} is binary: {e}")
             return True
 
+    @staticmethod
+    def _detect_encoding_bytes(raw_data: bytes, file_path: Path) -> str:
+        """Detect the encoding of a sample of file content.
+
+        Args:
+            raw_data: Sample bytes from the start of the file
+            file_path: Path to file (for logging)
+
+        Returns:
+            Detected encoding string
+        """
+        if _is_utf8_sample(raw_data):
+            return "utf-8"
+
+        encoding, confidence = _chardet_detect(bytes(raw_data))
+
+        if confidence < 0.7:
+            logger.debug(f"Low confidence ({confidence:.2f}) for encoding detection of {file_path}")
+
+        return encoding or "utf-8"
+
     def detect_encoding(self, file_path: Path) -> str:
         """Detect file encoding.
 
@@ -129,23 +323,42 @@ class FileChunker:
             Detected encoding string
         """
         try:
-            with open(file_path, "rb") as f:
-                raw_data = f.read(10000)  # Read first 10KB
-                result = chardet.detect(raw_data)
-                encoding = result.get("encoding", "utf-8")
-                confidence = result.get("confidence", 0)
-
-                if confidence < 0.7:
-                    logger.debug(
-                        f"Low confidence ({confidence:.2f}) for encoding detection of {file_path}"
-                    )
-
-                return encoding or "utf-8"
+            _, head = self._probe(file_path, max_bytes=10000)  # First 10KB
+            return self._detect_encoding_bytes(head, file_path)
 
         except Exception as e:
             logger.warning(f"Error detecting encoding for {file_path}: {e}")
             return "utf-8"
 
+    def _decode(self, data: bytes, file_path: Path) -> str:
+        """Decode file content, trying UTF-8 before any encoding detection.
+
+        Args:
+            data: File content
+            file_path: Path to file (for logging)
+
+        Returns:
+            Decoded content (undecodable bytes replaced as a last resort)
+        """
+        # Try UTF-8 first (most common); str() decodes straight from the buffer
+        try:
+            return str(data, "utf-8")
+        except UnicodeDecodeError:
+            pass
+
+        # Only now pay for detection, and trust its answer once
+        detected_encoding = self._detect_encoding_bytes(data[:10000], file_path)
+        if detected_encoding != "utf-8":
+            try:
+                content = str(data, detected_encoding)
+                logger.debug(f"Successfully read {file_path} with {detected_encoding}")
+                return content
+            except (UnicodeDecodeError, LookupError):
+                pass
+
+        logger.debug(f"Decoding {file_path} as UTF-8 with replacement characters")
+        return str(data, "utf-8", errors="replace")
+
     def read_file(self, file_path: Path) -> Optional[str]:
         """Read file content with encoding detection.
 
@@ -155,29 +368,49 @@ class FileChunker:
         Returns:
             File content as string, or None if unreadable
         """
-        # Try UTF-8 first (most common)
-        encodings = ["utf-8", "latin-1", "cp1252", "iso-8859-1"]
+        try:
+            _, data = self._probe(file_path)
+            return self._decode(data, file_path)
+        except Exception as e:
+            logger.error(f"Error reading {file_path}: {e}")
+            return None
 
-        # Add detected encoding to the front
-        detected_encoding = self.detect_encoding(file_path)
-        if detected_encoding not in encodings:
-            encodings.insert(0, detected_encoding)
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def language_id_for_suffix(suffix: str) -> int:
+        """Map a file suffix to its language id, caching per distinct suffix.
 
-        for encoding in encodings:
-            try:
-                with open(file_path, encoding=encoding) as f:
-                    content = f.read()
-                    logger.debug(f"Successfully read {file_path} with {encoding}")
-                    return content
+        Args:
+            suffix: File suffix including the dot, in any case (e.g. '.py', '.R')
 
-            except (UnicodeDecodeError, LookupError):
-                continue
-            except Exception as e:
-                logger.error(f"Error reading {file_path}: {e}")
-                return None
+        Returns:
+            Index into LANGUAGES (0 for 'unknown')
+        """
+        return FileChunker.EXTENSION_LANGUAGE_IDS.get(suffix.lower(), 0)
+
+    @staticmethod
+    def language_name(language_id: int) -> str:
+        """Get the language name for a language id.
+
+        Args:
+            language_id: Index into LANGUAGES
+
+        Returns:
+            Interned language name
+        """
+        return FileChunker.LANGUAGES[language_id]
 
-        logger.warning(f"Failed to read {file_path} with any encoding")
-        return None
+    @staticmethod
+    def language_for_suffix(suffix: str) -> str:
+        """Map a file suffix to its language.
+
+        Args:
+            suffix: File suffix including the dot, in any case (e.g. '.py', '.R')
+
+        Returns:
+            Interned language name or 'unknown'
+        """
+        return FileChunker.LANGUAGES[FileChunker.language_id_for_suffix(suffix)]
 
     def get_language(self, file_path: Path) -> str:
         """Detect programming language from file extension.
@@ -188,10 +421,45 @@ class FileChunker:
         Returns:
             Language name or 'unknown'
         """
-        ext = file_path.suffix.lower()
-        return self.CODE_EXTENSIONS.get(ext, "unknown")
+        return self.language_for_suffix(file_path.suffix)
+
+    @staticmethod
+    def _line_bounds(content: str) -> tuple[np.ndarray, np.ndarray]:
+        """Find the character span of every line with a single newline scan.
+
+        Args:
+            content: Text to scan
+
+        Returns:
+            Tuple of (starts, ends) arrays; line i is content[starts[i]:ends[i]],
+            including its newline. The last line's end counts an implied
+            trailing newline.
+        """
+        # UTF-32 gives one array element per character, so offsets index the str
+        codes = np.frombuffer(content.encode("utf-32-le"), dtype=np.uint32)
+        newlines = np.flatnonzero(codes == 0x0A)
 
-    def split_content_into_chunks(self, content: str, file_name: str = None) -> list[dict[str, any]]:
+        ends = np.empty(len(newlines) + 1, dtype=np.int64)
+        ends[:-1] = newlines + 1
+        ends[-1] = len(content) + 1
+
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1]
+        return starts, ends
+
+    @staticmethod
+    def _single_chunk(content: str) -> dict[str, Any]:
+        """Build the chunk dict for content that isn't split."""
+        return {
+            "content": content,
+            "start_line": 1,
+            "end_line": content.count("\n") + 1,  # Same as len(split), no list
+            "chunk_index": 0,
+            "total_chunks": 1,
+        }
+
+    def split_content_into_chunks(self, content: str, file_name: str = None) -> list[dict[str, Any]]:
         """Split content into multiple chunks based on max_chunk_tokens.
 
         Args:
@@ -201,182 +469,179 @@ class FileChunker:
         Returns:
             List of dicts with 'content', 'start_line', 'end_line'
         """
-        # If no chunking limit set, return entire content
-        if not self.max_chunk_tokens:
-            lines = content.split("\n")
-            return [
-                {
-                    "content": content,
-                    "start_line": 1,
-                    "end_line": len(lines),
-                    "chunk_index": 0,
-                    "total_chunks": 1,
-                }
-            ]
+        chunks = list(self.iter_content_chunks(content, file_name=file_name))
 
-        # Very conservative estimate for code: 1 token ≈ 1.5 characters
-        # Use 70% of limit to leave safety margin
-        max_chars = int(self.max_chunk_tokens * 1.5 * 0.7)
-
-        # If content fits in one chunk, don't split
-        if len(content) <= max_chars:
-            lines = content.split("\n")
-            return [
-                {
-                    "content": content,
-                    "start_line": 1,
-                    "end_line": len(lines),
-                    "chunk_index": 0,
-                    "total_chunks": 1,
-                }
-            ]
-
-        # Split into chunks
-        chunks = []
-        lines = content.split("\n")
-        current_chunk_lines = []
-        current_chunk_chars = 0
-        chunk_start_line = 1
-
-        for line_num, line in enumerate(lines, 1):
-            line_with_newline = line + "\n"
-            line_chars = len(line_with_newline)
+        # Update total_chunks for all chunks
+        total = len(chunks)
+        for chunk in chunks:
+            chunk["total_chunks"] = total
+
+        logger.debug(f"Split content into {total} chunks ({len(content)} chars)")
+        return chunks
+
+    def iter_content_chunks(self, content: str, file_name: str = None) -> Iterator[dict[str, Any]]:
+        """Yield content chunks one at a time based on max_chunk_tokens.
+
+        Args:
+            content: File content to split
+            file_name: Optional filename for logging
+
+        Yields:
+            Dicts with 'content', 'start_line', 'end_line', 'chunk_index' and
+            'total_chunks' (-1 until the total is known; see split_content_into_chunks)
+        """
+        # No chunking limit set, or content fits in one chunk: don't split
+        max_chars = self._max_chars
+        if max_chars is None or len(content) <= max_chars:
+            yield self._single_chunk(content)
+            return
+
+        # Split into chunks. Line boundaries come from one vectorized newline
+        # scan; the loop below runs once per chunk rather than once per line.
+        chunk_index = 0
+        starts, ends = self._line_bounds(content)
+        num_lines = len(starts)
+
+        # Lines longer than a chunk (counting their newline) get split on their own
+        long_lines = np.flatnonzero(ends - starts > max_chars).tolist()
+
+        # Plain lists: bisect on a list beats numpy scalar calls once per chunk
+        starts = starts.tolist()
+        ends = ends.tolist()
+
+        line_idx = 0
+        while line_idx < num_lines:
+            line_num = line_idx + 1
+            line_start = starts[line_idx]
+            line_end = ends[line_idx]
 
             # Handle extremely long lines by splitting them
-            if line_chars > max_chars:
+            if line_end - line_start > max_chars:
+                line_chars = line_end - line_start
                 file_info = f" in {file_name}" if file_name else ""
                 logger.info(
                     f"Line {line_num}{file_info} is very long ({line_chars} chars), splitting into pieces"
                 )
 
-                # First, save any accumulated content
-                if current_chunk_lines:
-                    chunk_content = "".join(current_chunk_lines).strip()
-                    chunks.append(
-                        {
-                            "content": chunk_content,
-                            "start_line": chunk_start_line,
-                            "end_line": line_num - 1,
-                            "chunk_index": len(chunks),
-                            "total_chunks": -1,
-                        }
-                    )
-                    current_chunk_lines = []
-                    current_chunk_chars = 0
-
-                # Split the long line into max_chars pieces
-                remaining = line_with_newline
+                # Split the long line into max_chars pieces, walking offsets into
+                # content so no copy of the line (or of its remainder) is made
+                pos = line_start
+                line_stop = line_end - 1  # Exclude the newline
+                # A break point only counts in the latter half of the window
+                min_break = max_chars // 2 + 1
                 piece_count = 0
-                while remaining:
+                while pos < line_stop:
                     # Take a chunk, try to break at a space if possible
-                    if len(remaining) <= max_chars:
-                        piece = remaining
-                        remaining = ""
+                    if line_stop - pos <= max_chars:
+                        cut = line_stop
                     else:
-                        # Try to find a good break point (space, comma, etc.)
-                        piece = remaining[:max_chars]
-                        # Look for last space in the piece to break cleanly
-                        last_space = piece.rfind(" ")
-                        if last_space > max_chars * 0.5:  # Only if space is in latter half
-                            piece = remaining[:last_space + 1]
-                            remaining = remaining[last_space + 1:]
-                        else:
-                            # No good break point, just split at max_chars
-                            remaining = remaining[max_chars:]
+                        cut = pos + max_chars
+                        # Look for the last space, scanning only the half where it may break
+                        last_space = content.rfind(" ", pos + min_break, cut)
+                        if last_space != -1:
+                            cut = last_space + 1
 
                     # Add this piece as its own chunk
-                    chunks.append(
-                        {
-                            "content": piece.strip(),
-                            "start_line": line_num,
-                            "end_line": line_num,
-                            "chunk_index": len(chunks),
-                            "total_chunks": -1,
-                        }
-                    )
+                    yield {
+                        "content": content[pos:cut].strip(),
+                        "start_line": line_num,
+                        "end_line": line_num,
+                        "chunk_index": chunk_index,
+                        "total_chunks": -1,
+                    }
+                    chunk_index += 1
                     piece_count += 1
+                    pos = cut
 
                 logger.debug(f"Split long line {line_num} into {piece_count} pieces")
-                chunk_start_line = line_num + 1
+                line_idx += 1
                 continue
 
-            # If adding this line would exceed limit and we have content, save current chunk
-            if current_chunk_chars + line_chars > max_chars and current_chunk_lines:
-                chunk_content = "".join(current_chunk_lines).strip()
-                chunks.append(
-                    {
-                        "content": chunk_content,
-                        "start_line": chunk_start_line,
-                        "end_line": line_num - 1,
-                        "chunk_index": len(chunks),
-                        "total_chunks": -1,  # Will update after
-                    }
-                )
-                current_chunk_lines = []
-                current_chunk_chars = 0
-                chunk_start_line = line_num
-
-            current_chunk_lines.append(line_with_newline)
-            current_chunk_chars += line_chars
-
-        # Add final chunk if any content remains
-        if current_chunk_lines:
-            chunk_content = "".join(current_chunk_lines).strip()
-            chunks.append(
-                {
-                    "content": chunk_content,
-                    "start_line": chunk_start_line,
-                    "end_line": len(lines),
-                    "chunk_index": len(chunks),
-                    "total_chunks": -1,
-                }
-            )
+            # Take every following line that still fits, stopping before the next long line
+            fit_end = bisect_right(ends, line_start + max_chars, line_idx)
+            next_long = bisect_left(long_lines, line_idx)
+            if next_long < len(long_lines):
+                fit_end = min(fit_end, long_lines[next_long])
+
+            yield {
+                "content": content[line_start : ends[fit_end - 1]].strip(),
+                "start_line": line_num,
+                "end_line": fit_end,
+                "chunk_index": chunk_index,
+                "total_chunks": -1,  # Known once all chunks are produced
+            }
+            chunk_index += 1
+            line_idx = fit_end
+
+
+    def chunk_file(
+        self, file_path: Path, codebase_root: Path, stats: Optional[os.stat_result] = None
+    ) -> list[ChainMap]:
+        """Create chunks from a file.
+
+        Args:
+            file_path: Path to file
+            codebase_root: Root directory of codebase (for relative paths)
+            stats: Stat result the caller already has (skips the fstat)
+
+        Returns:
+            List of chunk mappings (empty list if file cannot be processed).
+            Each chunk is a ChainMap of its own fields over one metadata dict
+            shared by every chunk of the file; writes go to the chunk's own
+            fields.
+        """
+        chunks = list(self.iter_chunks(file_path, codebase_root, stats))
 
         # Update total_chunks for all chunks
         total = len(chunks)
         for chunk in chunks:
             chunk["total_chunks"] = total
 
-        logger.debug(f"Split content into {total} chunks ({len(content)} chars)")
+        if total > 1:
+            logger.info(f"Split {file_path.name} into {total} chunks")
+
         return chunks
 
-    def chunk_file(self, file_path: Path, codebase_root: Path) -> list[dict]:
-        """Create chunks from a file.
+    def iter_chunks(
+        self, file_path: Path, codebase_root: Path, stats: Optional[os.stat_result] = None
+    ) -> Iterator[ChainMap]:
+        """Yield chunks from a file one at a time.
+
+        Lets callers process and release each chunk before the next is built.
+        Chunks have the same shape as chunk_file's, except that
+        'total_chunks' is -1 for files split into more than one chunk, since
+        the total is only known at the end.
 
         Args:
             file_path: Path to file
             codebase_root: Root directory of codebase (for relative paths)
+            stats: Stat result the caller already has; oversized and empty
+                files are then skipped without being opened
 
-        Returns:
-            List of chunk dictionaries (empty list if file cannot be processed)
+        Yields:
+            Chunk mappings (nothing if the file cannot be processed)
         """
-        # Check file size
-        try:
-            size = file_path.stat().st_size
-            if size > self.max_file_size:
-                logger.warning(
-                    f"Skipping {file_path}: size {size} exceeds max {self.max_file_size}"
-                )
-                return []
+        if stats is not None and not self._size_ok(file_path, stats.st_size):
+            return
 
-            if size == 0:
-                logger.debug(f"Skipping empty file: {file_path}")
-                return []
+        # One open/fstat/read serves the size check, binary probe and decode
+        try:
+            stats, data = self._probe(file_path, stats, max_size=self.max_file_size)
+            size = stats.st_size
+            if not self._size_ok(file_path, size):
+                return
 
-        except Exception as e:
-            logger.error(f"Error getting stats for {file_path}: {e}")
-            return []
+            # Check if binary (remembered across scans of unchanged files)
+            if self._is_binary_cached(file_path, stats, data):
+                logger.debug(f"Skipping binary file: {file_path}")
+                return
 
-        # Check if binary
-        if self.is_binary(file_path):
-            logger.debug(f"Skipping binary file: {file_path}")
-            return []
+            # Read content
+            content = self._decode(data, file_path)
 
-        # Read content
-        content = self.read_file(file_path)
-        if content is None:
-            logger.warning(f"Failed to read file: {file_path}")
-            return []
+        except Exception as e:
+            logger.error(f"Error reading {file_path}: {e}")
+            return
 
         # Get relative path
         try:
@@ -384,33 +649,149 @@ class FileChunker:
         except ValueError:
             relative_path = file_path
 
-        # Get metadata
-        stats = file_path.stat()
+        # Get metadata (computed once per file and shared by all its chunks).
+        # Walked paths are already absolute, so only relative ones need getcwd.
+        relative_path = str(relative_path)
+        absolute_path = str(file_path) if file_path.is_absolute() else os.path.abspath(file_path)
+        extension = file_path.suffix
         modified_at = datetime.fromtimestamp(stats.st_mtime).isoformat()
-        language = self.get_language(file_path)
-
-        # Split content into chunks (may be single chunk if small enough)
-        content_chunks = self.split_content_into_chunks(content, file_name=file_path.name)
-
-        # Build full chunks with file metadata
-        chunks = []
-        for content_chunk in content_chunks:
-            chunk = {
-                "file_path": str(relative_path),
-                "absolute_path": str(file_path.absolute()),
-                "content": content_chunk["content"],
-                "extension": file_path.suffix,
-                "size_bytes": size,
-                "modified_at": modified_at,
-                "language": language,
-                "start_line": content_chunk["start_line"],
-                "end_line": content_chunk["end_line"],
-                "chunk_index": content_chunk["chunk_index"],
-                "total_chunks": content_chunk["total_chunks"],
-            }
-            chunks.append(chunk)
+        language_id = self.language_id_for_suffix(extension)
+
+        file_meta = {
+            "file_path": relative_path,
+            "absolute_path": absolute_path,
+            "extension": extension,
+            "size_bytes": size,
+            "modified_at": modified_at,
+            "language": self.LANGUAGES[language_id],
+            "language_id": language_id,
+        }
+
+        # Build chunks lazily: per-chunk fields layered over the shared file metadata
+        for content_chunk in self.iter_content_chunks(content, file_name=file_path.name):
+            yield ChainMap(content_chunk, file_meta)
+
+    def _is_binary_cached(
+        self, file_path: Path, stats: os.stat_result, data: bytes
+    ) -> bool:
+        """Check if a file is binary, reusing the result for unchanged files.
 
-        if len(chunks) > 1:
-            logger.info(f"Split {file_path.name} into {len(chunks)} chunks")
+        Args:
+            file_path: Path to file
+            stats: Stat result of the file
+            data: File contents (only read on a cache miss)
 
-        return chunks
+        Returns:
+            True if binary, False if text
+        """
+        key = (stats.st_dev, stats.st_ino, stats.st_size, stats.st_mtime_ns)
+        binary = self._binary_cache.get(key)
+        if binary is None:
+            binary = not self._has_text_mime_type(file_path) and self.is_binary_bytes(
+                data[:BINARY_PROBE_BYTES]
+            )
+            if len(self._binary_cache) >= BINARY_CACHE_SIZE:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self._binary_cache[next(iter(self._binary_cache))]
+            self._binary_cache[key] = binary
+        return binary
+
+    def _size_ok(self, file_path: Path, size: int) -> bool:
+        """Check a file's size is within limits, logging why it's skipped if not.
+
+        Args:
+            file_path: Path to file (for logging)
+            size: File size in bytes
+
+        Returns:
+            True if the file should be chunked
+        """
+        if size > self.max_file_size:
+            logger.warning(f"Skipping {file_path}: size {size} exceeds max {self.max_file_size}")
+            return False
+
+        if size == 0:
+            logger.debug(f"Skipping empty file: {file_path}")
+            return False
+
+        return True
+
+    @staticmethod
+    def _prefetch(file_paths: list[Path]) -> None:
+        """Ask the kernel to start reading files in the background.
+
+        Issues POSIX_FADV_WILLNEED for every file up front so their reads
+        overlap with processing the earlier ones. A no-op where
+        posix_fadvise isn't available (macOS, Windows).
+
+        Args:
+            file_paths: Files that are about to be read
+        """
+        if not hasattr(os, "posix_fadvise"):
+            return
+
+        for file_path in file_paths:
+            try:
+                fd = os.open(file_path, os.O_RDONLY)
+            except OSError:
+                continue  # chunk_file reports unreadable files
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+    def chunk_files(
+        self,
+        file_paths: Iterable[Path],
+        codebase_root: Path,
+        pool: Optional[ProcessPoolExecutor] = None,
+    ) -> list[list[ChainMap]]:
+        """Create chunks from several files, prefetching them as a batch.
+
+        Args:
+            file_paths: Paths to files
+            codebase_root: Root directory of codebase (for relative paths)
+            pool: Worker pool from chunk_pool() to chunk the files in (default:
+                chunk them in this process)
+
+        Returns:
+            One list of chunk dictionaries per file, in input order (empty
+            list for files that cannot be processed)
+
+        Raises:
+            BrokenProcessPool: A worker process died; the pool can't be used again
+        """
+        file_paths = list(file_paths)
+        self._prefetch(file_paths)
+
+        if pool is not None:
+            results = pool.map(
+                _chunk_in_worker,
+                [(file_path, codebase_root) for file_path in file_paths],
+                chunksize=CHUNK_TASK_FILES,
+            )
+            return [chunks for _, chunks in results]
+
+        return [self.chunk_file(file_path, codebase_root) for file_path in file_paths]
+
+    def chunk_pool(self, workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """Start worker processes that chunk files with this chunker's limits.
+
+        Args:
+            workers: Number of worker processes (default: CPUs available to this process)
+
+        Returns:
+            Process pool for chunk_files; use it as a context manager
+        """
+        # forkserver avoids forking a parent that may hold open HTTP clients and threads
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+        return ProcessPoolExecutor(
+            workers or default_chunk_workers(),
+            mp_context=context,
+            initializer=_init_chunk_worker,
+            initargs=(self.max_file_size, self.max_chunk_tokens),
+        )
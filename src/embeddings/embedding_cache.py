@@ -0,0 +1,146 @@
+"""Persistent cache of embeddings keyed by model and text."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Keys looked up per SELECT (stays under SQLite's bound-parameter limit)
+LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """SQLite-backed map from (model, dimension, text) to embedding vector.
+
+    Vectors are stored as raw float32, float16 or int8 bytes (int8 codes are
+    prefixed with their float32 scale) and always read back as float32. Keys
+    are blake2b digests, so the cache never holds the source text itself.
+    """
+
+    def __init__(self, path: Path, model: str, dimension: int, dtype: str = "float32"):
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file
+            model: Embedding model name the vectors come from
+            dimension: Embedding dimension of the model
+            dtype: Storage precision: "float32", "float16" or "int8"
+        """
+        if dtype not in ("float32", "float16", "int8"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+
+        self.path = path
+        self.model = model
+        self.dimension = dimension
+        self.dtype = dtype
+        # The dtype is part of the key, so changing it never misreads old entries
+        self._key_prefix = f"{model}\0{dimension}\0{dtype}\0".encode()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared across threads; every access goes through _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @classmethod
+    def open_default(cls, model: str, dimension: int) -> Optional["EmbeddingCache"]:
+        """Open the per-user cache in the state directory.
+
+        Args:
+            model: Embedding model name
+            dimension: Embedding dimension of the model
+
+        Returns:
+            EmbeddingCache, or None if it can't be opened
+        """
+        settings = get_settings()
+        path = settings.state_dir / "embeddings.db"
+        try:
+            return cls(path, model, dimension, settings.embedding_cache_dtype)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache disabled, could not open {path}: {e}")
+            return None
+
+    def key(self, text: str) -> bytes:
+        """Cache key for a text under this cache's model and dimension."""
+        return hashlib.blake2b(
+            self._key_prefix + text.encode("utf-8", errors="surrogatepass"), digest_size=16
+        ).digest()
+
+    def _encode(self, vector: np.ndarray) -> bytes:
+        """Serialize a vector in the storage dtype."""
+        vector = np.asarray(vector, dtype=np.float32)
+        if self.dtype == "int8":
+            max_abs = float(np.abs(vector).max(initial=0.0))
+            scale = np.float32(max_abs / 127 if max_abs else 1.0)
+            codes = np.round(vector / scale).astype(np.int8)
+            return scale.tobytes() + codes.tobytes()
+        return vector.astype(self.dtype, copy=False).tobytes()
+
+    def _decode(self, blob: bytes) -> np.ndarray:
+        """Deserialize a stored vector as float32."""
+        if self.dtype == "int8":
+            scale = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+            return np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale
+        return np.frombuffer(blob, dtype=self.dtype).astype(np.float32, copy=False)
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Look up cached embeddings.
+
+        Args:
+            keys: Keys from key()
+
+        Returns:
+            Mapping of found keys to their float32 embedding vectors (may be read-only)
+        """
+        found = {}
+        with self._lock:
+            try:
+                for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                    batch = keys[start : start + LOOKUP_BATCH_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT key, vec FROM cache WHERE key IN ({placeholders})", batch
+                    )
+                    for key, vec in rows:
+                        found[key] = self._decode(vec)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read embedding cache: {e}")
+        return found
+
+    def put_many(self, items: list[tuple[bytes, np.ndarray]]) -> None:
+        """Store embeddings in a single transaction.
+
+        Args:
+            items: (key, embedding) pairs
+        """
+        if not items:
+            return
+        rows = [(key, self._encode(vec)) for key, vec in items]
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO cache (key, vec) VALUES (?, ?)", rows
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not save embeddings to cache: {e}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
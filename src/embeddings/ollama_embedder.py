@@ -1,14 +1,175 @@
 """Ollama embedding generation client."""
 
+import json
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
+from pathlib import Path
+from typing import Optional, Union
 
+import httpx
+import numpy as np
 from ollama import Client
 
-from config.settings import settings
+from config.settings import get_settings
+from src.embeddings.embedding_cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
+# Idle seconds before a pooled connection to Ollama is dropped (httpx defaults to 5)
+KEEPALIVE_EXPIRY = 300
+
+
+def _dimension_cache_path() -> Path:
+    """Path of the JSON file caching detected embedding dimensions per model."""
+    return get_settings().data_dir / ".dim_cache.json"
+
+
+def _load_dimension_cache() -> dict:
+    """Load cached embedding dimensions, or an empty dict if none are cached."""
+    try:
+        return json.loads(_dimension_cache_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+@cache
+def _shared_client(host: str) -> Client:
+    """Ollama client shared by everything in the process talking to a host.
+
+    Its pooled keep-alive connections are reused across embedder instances,
+    batches and queries instead of reconnecting for each.
+
+    Args:
+        host: Ollama server URL
+
+    Returns:
+        Client with one pooled connection per concurrent request
+    """
+    settings = get_settings()
+    connections = max(settings.embed_parallelism, settings.query_workers)
+    return Client(
+        host=host,
+        limits=httpx.Limits(
+            max_connections=connections,
+            max_keepalive_connections=connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+@cache
+def _model_info(host: str, model: str) -> dict:
+    """Fetch a model's metadata from Ollama, once per (host, model) per process.
+
+    Args:
+        host: Ollama server URL
+        model: Model name
+
+    Returns:
+        The ``modelinfo`` mapping from ``ollama show``
+
+    Raises:
+        Exception: Whatever the Ollama client raises (failures aren't cached)
+    """
+    return _shared_client(host).show(model).get("modelinfo") or {}
+
+
+@cache
+def _available_models(host: str) -> Optional[tuple[str, ...]]:
+    """List the models installed on an Ollama server, once per host per process.
+
+    Args:
+        host: Ollama server URL
+
+    Returns:
+        Installed model names (with tags), or None if the list can't be parsed
+
+    Raises:
+        Exception: Whatever the Ollama client raises (failures aren't cached)
+    """
+    response = _shared_client(host).list()
+
+    # Handle response - it might be a dict or an object
+    if hasattr(response, "models"):
+        models = response.models
+    elif isinstance(response, dict):
+        models = response.get("models", [])
+    else:
+        return None
+
+    # Extract model names
+    available_models = []
+    for m in models:
+        if hasattr(m, "model"):
+            available_models.append(m.model)
+        elif isinstance(m, dict):
+            available_models.append(m.get("name", m.get("model", "")))
+    return tuple(available_models)
+
+
+def probe_dimension(model: Optional[str] = None, host: Optional[str] = None) -> int:
+    """Get the embedding dimension of a model, asking Ollama only on a cache miss.
+
+    Detected dimensions are cached per model in ``data/.dim_cache.json``, so
+    warm runs need no Ollama round-trip at all.
+
+    Args:
+        model: Embedding model name (default from settings)
+        host: Ollama server URL (default from settings)
+
+    Returns:
+        Embedding dimension size
+
+    Falls back to settings.embedding_dimension if detection fails.
+    """
+    settings = get_settings()
+    model = model or settings.embedding_model
+
+    # If explicitly set in env, use that (allows manual override)
+    if "EMBEDDING_DIMENSION" in os.environ:
+        dim = settings.embedding_dimension
+        logger.info(f"Using manually configured dimension: {dim}")
+        return dim
+
+    dimension_cache = _load_dimension_cache()
+    if model in dimension_cache:
+        return dimension_cache[model]
+
+    # Try to auto-detect from Ollama
+    try:
+        model_info = _model_info(host or settings.ollama_host, model)
+
+        # Search for any key ending in '.embedding_length'
+        # This works for any model architecture without hardcoding
+        for key, value in model_info.items():
+            if key.endswith(".embedding_length"):
+                logger.info(f"Auto-detected embedding dimension from '{key}': {value}")
+                break
+        else:
+            logger.warning(
+                f"Could not find embedding dimension in model info, using default: {settings.embedding_dimension}"
+            )
+            return settings.embedding_dimension
+
+    except Exception as e:
+        logger.warning(
+            f"Failed to auto-detect dimension: {e}, using default: {settings.embedding_dimension}"
+        )
+        return settings.embedding_dimension
+
+    dimension_cache[model] = value
+    try:
+        cache_path = _dimension_cache_path()
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(dimension_cache, indent=2), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Could not save detected dimension: {e}")
+
+    return value
+
 
 class OllamaEmbedder:
     """Client for generating embeddings using Ollama."""
@@ -17,22 +178,43 @@ class OllamaEmbedder:
         self,
         host: str = None,
         model: str = None,
+        use_cache: Optional[bool] = None,
     ):
         """Initialize Ollama embedder.
 
         Args:
             host: Ollama server URL (default from settings)
             model: Embedding model name (default from settings)
+            use_cache: Whether to use the on-disk embedding cache (default from settings)
         """
+        settings = get_settings()
         self.host = host or settings.ollama_host
         self.model = model or settings.embedding_model
+        self.request_size = settings.embed_request_size
+        self.parallelism = settings.embed_parallelism
 
-        self.client = Client(host=self.host)
+        # Pooled connections kept open between batches and queries, and shared
+        # with other embedders (and model lookups) for the same host
+        self.client = _shared_client(self.host)
 
         # Auto-detect dimension and context length from model
         self.dimension = self._detect_dimension()
         self.context_length = self._detect_context_length()
 
+        # In-memory LRU for embed(), which serves queries
+        self._embed_cached = lru_cache(maxsize=settings.query_embedding_cache_size)(
+            self._embed_to_array
+        )
+
+        # Shared read-only placeholder for empty or failed single-text batches
+        self._zero_vector = np.zeros(self.dimension, dtype=np.float32)
+        self._zero_vector.setflags(write=False)
+
+        # Embeddings from earlier runs, keyed by model, dimension and text
+        if use_cache is None:
+            use_cache = settings.use_embedding_cache
+        self.cache = EmbeddingCache.open_default(self.model, self.dimension) if use_cache else None
+
         logger.info(
             f"Initialized OllamaEmbedder with model={self.model}, dimension={self.dimension}, context_length={self.context_length}, host={self.host}"
         )
@@ -48,36 +230,7 @@ class OllamaEmbedder:
 
         Falls back to settings.embedding_dimension if detection fails.
         """
-        import os
-
-        # If explicitly set in env, use that (allows manual override)
-        if "EMBEDDING_DIMENSION" in os.environ:
-            dim = settings.embedding_dimension
-            logger.info(f"Using manually configured dimension: {dim}")
-            return dim
-
-        # Try to auto-detect from Ollama
-        try:
-            response = self.client.show(self.model)
-            model_info = response.get("modelinfo", {})
-
-            # Search for any key ending in '.embedding_length'
-            # This works for any model architecture without hardcoding
-            for key, value in model_info.items():
-                if key.endswith(".embedding_length"):
-                    logger.info(f"Auto-detected embedding dimension from '{key}': {value}")
-                    return value
-
-            logger.warning(
-                f"Could not find embedding dimension in model info, using default: {settings.embedding_dimension}"
-            )
-            return settings.embedding_dimension
-
-        except Exception as e:
-            logger.warning(
-                f"Failed to auto-detect dimension: {e}, using default: {settings.embedding_dimension}"
-            )
-            return settings.embedding_dimension
+        return probe_dimension(self.model, self.host)
 
     def _detect_context_length(self) -> int:
         """Auto-detect context length from the model.
@@ -88,8 +241,8 @@ class OllamaEmbedder:
         Falls back to 512 if detection fails.
         """
         try:
-            response = self.client.show(self.model)
-            model_info = response.get("modelinfo", {})
+            # Shares the show request made while detecting the dimension
+            model_info = _model_info(self.host, self.model)
 
             # Search for any key ending in '.context_length'
             for key, value in model_info.items():
@@ -107,29 +260,19 @@ class OllamaEmbedder:
     def _verify_model(self) -> None:
         """Verify that the embedding model is available."""
         try:
-            response = self.client.list()
-
-            # Handle response - it might be a dict or an object
-            if hasattr(response, "models"):
-                models = response.models
-            elif isinstance(response, dict):
-                models = response.get("models", [])
-            else:
+            available_models = _available_models(self.host)
+            if available_models is None:
                 # If we can't parse, just skip verification
                 logger.debug("Could not parse Ollama model list, skipping verification")
                 return
 
-            # Extract model names
-            available_models = []
-            for m in models:
-                if hasattr(m, "model"):
-                    available_models.append(m.model)
-                elif isinstance(m, dict):
-                    available_models.append(m.get("name", m.get("model", "")))
+            # An untagged name matches any tag of the model (e.g. ':latest')
+            model_names = set(available_models)
+            model_names.update(m.split(":", 1)[0] for m in available_models)
 
-            if not any(self.model in m for m in available_models):
+            if self.model not in model_names:
                 logger.warning(
-                    f"Model '{self.model}' not found in Ollama. Available models: {available_models}"
+                    f"Model '{self.model}' not found in Ollama. Available models: {list(available_models)}"
                 )
                 logger.warning(f"Please run: ollama pull {self.model}")
 
@@ -140,6 +283,9 @@ class OllamaEmbedder:
     def embed(self, text: str, retry_count: int = 3) -> list[float]:
         """Generate embedding for a single text.
 
+        Recent results are kept in memory, and all results in the embedding
+        cache, so repeating a query doesn't repeat the round-trip to Ollama.
+
         Args:
             text: Text to embed
             retry_count: Number of retries on failure
@@ -154,6 +300,97 @@ class OllamaEmbedder:
             logger.warning("Empty text provided for embedding, returning zero vector")
             return [0.0] * self.dimension
 
+        # Failures raise, so they are never cached
+        return self._embed_cached(text, retry_count).tolist()
+
+    def clear_query_cache(self) -> None:
+        """Forget the in-memory embeddings kept by embed()."""
+        self._embed_cached.cache_clear()
+
+    def _embed_to_array(self, text: str, retry_count: int) -> np.ndarray:
+        """Embed a text as a float32 array (4 bytes per value while cached)."""
+        if self.cache is None:
+            return np.asarray(self._request_embedding(text, retry_count), dtype=np.float32)
+
+        key = self.cache.key(text)
+        cached = self.cache.get_many([key]).get(key)
+        if cached is not None:
+            return cached
+
+        vector = np.asarray(self._request_embedding(text, retry_count), dtype=np.float32)
+        self.cache.put_many([(key, vector)])
+        return vector
+
+    def warmup(self) -> None:
+        """Have Ollama load the model, bypassing the embedding caches.
+
+        Raises:
+            RuntimeError: If the request fails
+        """
+        self._request_embedding("warmup", retry_count=1)
+
+    def embed_request(self, texts: list[str]) -> np.ndarray:
+        """Embed texts in a single request, bypassing the embedding caches.
+
+        Lets callers time requests (see batch_tuning) without filling the
+        cache with their inputs.
+
+        Args:
+            texts: Non-empty texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+
+        Raises:
+            RuntimeError: If the request fails
+        """
+        return self._embed_request([self._fit_to_context(text) for text in texts], retry_count=1)
+
+    def _request_embedding(self, text: str, retry_count: int = 3) -> list[float]:
+        """Request the embedding of one non-empty text from Ollama.
+
+        Args:
+            text: Text to embed
+            retry_count: Number of retries on failure
+
+        Returns:
+            Embedding vector as list of floats
+
+        Raises:
+            RuntimeError: If embedding generation fails after retries
+        """
+        text = self._fit_to_context(text)
+
+        for attempt in range(retry_count):
+            try:
+                # %-style so the preview is only built when DEBUG is enabled
+                logger.debug("Embedding text: length=%d, preview=%r...", len(text), text[:100])
+
+                response = self.client.embeddings(model=self.model, prompt=text)
+                embedding = response["embedding"]
+                self._check_embedding(embedding)
+                return embedding
+
+            except Exception as e:
+                logger.warning(f"Embedding attempt {attempt + 1}/{retry_count} failed: {e}")
+
+                if attempt < retry_count - 1:
+                    wait_time = 2**attempt  # Exponential backoff
+                    logger.info(f"Retrying in {wait_time} seconds...")
+                    time.sleep(wait_time)
+                else:
+                    logger.error(f"Failed to generate embedding after {retry_count} attempts")
+                    raise RuntimeError(f"Embedding generation failed: {e}") from e
+
+    def _fit_to_context(self, text: str) -> str:
+        """Truncate text that could exceed the model's context length.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            The text, truncated if it's too long
+        """
         # Safety check: ensure text doesn't exceed context length
         # Very conservative estimate: 1 token ≈ 1.5 characters for code
         estimated_tokens = len(text) / 1.5
@@ -165,110 +402,303 @@ class OllamaEmbedder:
                 f"Text too long ({len(text)} chars, ~{estimated_tokens:.0f} est tokens) for context length {self.context_length}, truncating to {max_chars} chars"
             )
             text = text[:max_chars]
+        return text
 
-        for attempt in range(retry_count):
-            try:
-                logger.debug(f"Embedding text: length={len(text)}, preview={text[:100]!r}...")
+    def _check_embedding(self, embedding: list[float]) -> None:
+        """Log invalid values or an unexpected dimension in an embedding."""
+        # float32 is what the store keeps, so values that overflow it count as inf
+        with np.errstate(over="ignore"):
+            values = np.asarray(embedding, dtype=np.float32)
 
-                response = self.client.embeddings(model=self.model, prompt=text)
-                embedding = response["embedding"]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Received embedding: dim={len(values)}, min={values.min():.4f}, max={values.max():.4f}"
+            )
 
-                # Debug: Check for invalid values
-                logger.debug(
-                    f"Received embedding: dim={len(embedding)}, min={min(embedding):.4f}, max={max(embedding):.4f}"
-                )
+        # Check for inf/nan values
+        if not np.isfinite(values).all():
+            inf_count = int(np.isinf(values).sum())
+            nan_count = int(np.isnan(values).sum())
+            logger.error(f"Invalid embedding values: inf_count={inf_count}, nan_count={nan_count}")
 
-                # Check for inf/nan values
-                import math
+        # Verify dimension
+        if len(embedding) != self.dimension:
+            logger.warning(
+                f"Unexpected embedding dimension: {len(embedding)} (expected {self.dimension})"
+            )
 
-                inf_count = sum(1 for v in embedding if math.isinf(v))
-                nan_count = sum(1 for v in embedding if math.isnan(v))
-                if inf_count > 0 or nan_count > 0:
-                    logger.error(
-                        f"Invalid embedding values: inf_count={inf_count}, nan_count={nan_count}"
-                    )
+    def _embed_request(self, texts: list[str], retry_count: int = 3) -> np.ndarray:
+        """Embed several non-empty texts in one request to Ollama's batch endpoint.
 
-                # Verify dimension
-                if len(embedding) != self.dimension:
-                    logger.warning(
-                        f"Unexpected embedding dimension: {len(embedding)} (expected {self.dimension})"
-                    )
+        Args:
+            texts: Texts to embed (already fitted to the context length)
+            retry_count: Number of retries on failure
 
-                return embedding
+        Returns:
+            float32 array of shape (len(texts), dimension), rows in the order of texts
+
+        Raises:
+            RuntimeError: If the request fails after retries
+        """
+        for attempt in range(retry_count):
+            try:
+                logger.debug("Embedding %d texts in one request", len(texts))
+
+                response = self.client.embed(model=self.model, input=texts)
+                embeddings = response["embeddings"]
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"got {len(embeddings)} embeddings for {len(texts)} texts")
+
+                for embedding in embeddings:
+                    self._check_embedding(embedding)
+
+                vectors = np.asarray(embeddings, dtype=np.float32)
+                if vectors.shape != (len(texts), self.dimension):
+                    raise ValueError(f"got embeddings of shape {vectors.shape}")
+                return vectors
 
             except Exception as e:
-                logger.warning(f"Embedding attempt {attempt + 1}/{retry_count} failed: {e}")
+                logger.warning(f"Batch embedding attempt {attempt + 1}/{retry_count} failed: {e}")
 
                 if attempt < retry_count - 1:
                     wait_time = 2**attempt  # Exponential backoff
                     logger.info(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                 else:
-                    logger.error(f"Failed to generate embedding after {retry_count} attempts")
-                    raise RuntimeError(f"Embedding generation failed: {e}") from e
+                    raise RuntimeError(f"Batch embedding failed: {e}") from e
+
+    def _embed_single(self, text: str, retry_count: int = 1) -> Union[list[float], RuntimeError]:
+        """Embed one text, returning rather than raising errors.
+
+        Args:
+            text: Text to embed
+            retry_count: Number of attempts (the batch fallback path already
+                retried the batch request, so it doesn't back off again)
+
+        Returns:
+            Embedding vector, or the error if embedding failed (so a thread
+            pool can collect failures alongside results)
+        """
+        try:
+            # Bypasses embed()'s in-memory cache; batch results go to the disk cache
+            vector = self._request_embedding(text, retry_count=retry_count)
+        except RuntimeError as e:
+            return e
+        if len(vector) != self.dimension:
+            return RuntimeError(f"got {len(vector)} dimensions, expected {self.dimension}")
+        return vector
+
+    def _embed_one(
+        self, text: str, identifiers: list[str] = None
+    ) -> Union[list[float], np.ndarray]:
+        """Embed a single-text batch without the batching machinery.
+
+        Args:
+            text: Text to embed
+            identifiers: Optional identifiers for error logging (first one is used)
+
+        Returns:
+            Embedding vector (zero vector if empty or failed)
+        """
+        if not text or not text.strip():
+            logger.warning("1 empty texts provided for embedding, using zero vectors")
+            return self._zero_vector
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(text)
+            cached = self.cache.get_many([key]).get(key)
+            if cached is not None:
+                return cached
+
+        vector = self._embed_single(text, retry_count=3)
+        if isinstance(vector, RuntimeError):
+            identifier = f" ({identifiers[0]})" if identifiers else ""
+            logger.error(f"Failed to embed text at index 0{identifier}: {vector}")
+            logger.warning("Failed to generate embeddings for 1 texts")
+            return self._zero_vector
+
+        if key is not None:
+            self.cache.put_many([(key, vector)])
+        return vector
+
+    def _embed_slice(
+        self, texts: list[str], batch: list[int], identifiers: list[str] = None
+    ) -> tuple[np.ndarray, list[int]]:
+        """Embed the texts at some indices in one request.
+
+        If the request keeps failing, the texts are retried one by one
+        (``parallelism`` requests at a time) so a single bad text only costs
+        its own embedding.
+
+        Args:
+            texts: All texts of the batch
+            batch: Indices of the texts to embed
+            identifiers: Optional identifiers for error logging
+
+        Returns:
+            Tuple of (embeddings with one row per index, indices that failed);
+            rows of failed texts are zero
+        """
+        try:
+            return self._embed_request([self._fit_to_context(texts[idx]) for idx in batch]), []
+        except RuntimeError as e:
+            logger.warning(f"{e}; falling back to one request per text")
 
-    def embed_batch(self, texts: list[str], show_progress: bool = False, identifiers: list[str] = None) -> list[list[float]]:
+        vectors = np.zeros((len(batch), self.dimension), dtype=np.float32)
+        failed_indices = []
+        workers = min(self.parallelism, len(batch))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(self._embed_single, [texts[idx] for idx in batch])
+            for row, (idx, result) in enumerate(zip(batch, results)):
+                if isinstance(result, RuntimeError):
+                    identifier = f" ({identifiers[idx]})" if identifiers and idx < len(identifiers) else ""
+                    logger.error(f"Failed to embed text at index {idx}{identifier}: {result}")
+                    # Row stays a zero vector as placeholder
+                    failed_indices.append(idx)
+                else:
+                    vectors[row] = result
+        return vectors, failed_indices
+
+    def embed_batch(self, texts: list[str], show_progress: bool = False, identifiers: list[str] = None) -> np.ndarray:
         """Generate embeddings for multiple texts.
 
+        Repeated texts are embedded once, and texts already in the embedding
+        cache are not sent to Ollama; the rest are sent up to ``request_size``
+        at a time, with up to ``parallelism`` requests in flight.
+
         Args:
             texts: List of texts to embed
             show_progress: Whether to show progress bar
             identifiers: Optional list of identifiers (e.g., file paths) for error logging
 
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimension); rows of empty or
+            failed texts are zero
         """
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
         if not texts:
-            return []
+            return embeddings
+
+        if len(texts) == 1:
+            embeddings[0] = self._embed_one(texts[0], identifiers)
+            return embeddings
 
-        embeddings = []
         failed_indices = []
 
-        iterator = texts
+        # Empty texts keep their zero vector without a round-trip, and repeated
+        # texts (license headers, boilerplate) are embedded once and copied
+        pending = []
+        duplicates = []
+        first_index = {}
+        for idx, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            first = first_index.setdefault(text, idx)
+            if first == idx:
+                pending.append(idx)
+            else:
+                duplicates.append((idx, first))
+
+        empty_count = len(texts) - len(pending) - len(duplicates)
+        if empty_count:
+            logger.warning(f"{empty_count} empty texts provided for embedding, using zero vectors")
+
+        # Reuse embeddings computed on earlier runs
+        keys = {}
+        if self.cache is not None and pending:
+            keys = {idx: self.cache.key(texts[idx]) for idx in pending}
+            cached = self.cache.get_many(list(keys.values()))
+            if cached:
+                misses = []
+                for idx in pending:
+                    vector = cached.get(keys[idx])
+                    if vector is None:
+                        misses.append(idx)
+                    else:
+                        embeddings[idx] = vector
+                pending = misses
+                logger.debug("Embedding cache hits: %d/%d", len(cached), len(texts))
+
+        progress = None
         if show_progress:
             try:
                 from tqdm import tqdm
 
-                iterator = tqdm(texts, desc="Generating embeddings")
+                progress = tqdm(total=len(texts), desc="Generating embeddings")
+                progress.update(len(texts) - len(pending))
             except ImportError:
                 pass
 
-        for idx, text in enumerate(iterator):
-            try:
-                embedding = self.embed(text)
-                embeddings.append(embedding)
-            except RuntimeError as e:
-                identifier = f" ({identifiers[idx]})" if identifiers and idx < len(identifiers) else ""
-                logger.error(f"Failed to embed text at index {idx}{identifier}: {e}")
-                failed_indices.append(idx)
-                # Add zero vector as placeholder
-                embeddings.append([0.0] * self.dimension)
+        # Requests go out ``parallelism`` at a time so Ollama works on several
+        # slices at once; results are consumed in order
+        slices = [
+            pending[start : start + self.request_size]
+            for start in range(0, len(pending), self.request_size)
+        ]
+        workers = min(self.parallelism, len(slices))
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            map_fn = executor.map if executor is not None else map
+            results = map_fn(lambda batch: self._embed_slice(texts, batch, identifiers), slices)
+            for batch, (vectors, failed) in zip(slices, results):
+                embeddings[batch] = vectors
+                failed_indices.extend(failed)
+
+                if keys:
+                    failed = set(failed)
+                    self.cache.put_many(
+                        [(keys[idx], embeddings[idx]) for idx in batch if idx not in failed]
+                    )
+                if progress is not None:
+                    progress.update(len(batch))
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if progress is not None:
+            progress.close()
+
+        if duplicates:
+            copies, sources = zip(*duplicates)
+            embeddings[list(copies)] = embeddings[list(sources)]
 
         if failed_indices:
             logger.warning(f"Failed to generate embeddings for {len(failed_indices)} texts")
 
         return embeddings
 
-    def embed_with_metadata(self, items: list[dict], text_key: str = "content") -> list[dict]:
+    def embed_with_metadata(
+        self, items: list[dict], text_key: str = "content", inplace: bool = False
+    ) -> list[dict]:
         """Generate embeddings for items with metadata.
 
         Args:
             items: List of dictionaries containing text and metadata
             text_key: Key in dict containing the text to embed
+            inplace: Add the 'embedding' field to the given items instead of copies
 
         Returns:
-            List of items with 'embedding' field added
+            List of items with 'embedding' field added (the items list itself
+            when inplace is True)
         """
         texts = [item.get(text_key, "") for item in items]
         embeddings = self.embed_batch(texts)
 
-        results = []
-        for item, embedding in zip(items, embeddings):
-            result = item.copy()
-            result["embedding"] = embedding
-            results.append(result)
+        if inplace:
+            for item, embedding in zip(items, embeddings):
+                item["embedding"] = embedding
+            return items
+
+        return [{**item, "embedding": embedding} for item, embedding in zip(items, embeddings)]
 
-        return results
+    def close(self) -> None:
+        """Close the embedding cache.
+
+        The Ollama client is shared across the process and stays open.
+        """
+        if self.cache is not None:
+            self.cache.close()
 
     def test_connection(self) -> bool:
         """Test connection to Ollama server.
@@ -0,0 +1,131 @@
+"""Pick the embed request size from measured embedding latency."""
+
+import json
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Optional
+
+from config.settings import get_settings
+from src.embeddings.ollama_embedder import OllamaEmbedder
+
+logger = logging.getLogger(__name__)
+
+# Request sizes (texts per embed request) tried during probing, smallest first
+CANDIDATE_BATCH_SIZES = (1, 4, 16, 64)
+
+# Timed runs per candidate size
+PROBE_REPEATS = 3
+
+# Representative code snippet (~500 chars) used as probe input
+PROBE_TEXT = "def probe(value):\n    return [value * 2 for _ in range(10)]\n" * 8
+
+
+def _tuning_cache_path() -> Path:
+    """Path of the JSON file holding tuned request sizes."""
+    return get_settings().state_dir / "batch_tune.json"
+
+
+def _load_tuning_cache() -> dict:
+    """Load tuned request sizes, or an empty dict if none are cached."""
+    try:
+        return json.loads(_tuning_cache_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _time_batch(embedder: OllamaEmbedder, texts: list[str]) -> Optional[float]:
+    """Time one embed request, bypassing the embedding cache.
+
+    Args:
+        embedder: Embedder to probe
+        texts: Texts to embed
+
+    Returns:
+        Latency in milliseconds, or None if the request failed
+    """
+    start = time.perf_counter()
+    try:
+        embedder.embed_request(texts)
+    except Exception as e:
+        logger.warning(f"Batch size probe failed: {e}")
+        return None
+    return (time.perf_counter() - start) * 1000
+
+
+def probe_optimal_batch_size(
+    embedder: OllamaEmbedder, latency_slo_ms: Optional[float] = None
+) -> int:
+    """Find the largest embed request size whose latency stays within the SLO.
+
+    Each probe is a single request of that many texts, so the result is meant
+    for the embedder's request_size (chunks per request), not for the number
+    of files per indexing batch. Results are cached per (model, dimension) so
+    probing only happens once. If the model can't be loaded or any probe
+    fails, the configured request size is used and nothing is cached, so the
+    next run probes again.
+
+    Args:
+        embedder: Embedder to probe
+        latency_slo_ms: Maximum acceptable p95 request latency in milliseconds
+            (default from settings)
+
+    Returns:
+        Chosen request size
+    """
+    settings = get_settings()
+    latency_slo_ms = latency_slo_ms or settings.batch_latency_slo_ms
+    cache_key = f"{embedder.model}:{embedder.dimension}"
+
+    tuning_cache = _load_tuning_cache()
+    if cache_key in tuning_cache:
+        return tuning_cache[cache_key]
+
+    logger.info(
+        f"Probing embedding latency to pick a request size (SLO {latency_slo_ms:.0f} ms)..."
+    )
+
+    # Load the model first so a cold start isn't timed as batch latency
+    try:
+        embedder.warmup()
+    except Exception as e:
+        logger.warning(f"Batch size probing skipped, using {settings.embed_request_size}: {e}")
+        return settings.embed_request_size
+
+    chosen = CANDIDATE_BATCH_SIZES[0]
+    for size in CANDIDATE_BATCH_SIZES:
+        latencies = []
+        for repeat in range(PROBE_REPEATS):
+            # Vary the texts so no server-side cache can short-circuit the probe
+            texts = [f"{PROBE_TEXT}# probe {time.time_ns()} {repeat} {i}" for i in range(size)]
+            latency_ms = _time_batch(embedder, texts)
+            if latency_ms is None:
+                logger.warning(f"Batch size probing failed, using {settings.embed_request_size}")
+                return settings.embed_request_size
+            latencies.append(latency_ms)
+
+        p95 = _percentile(latencies, 95)
+        logger.info(f"Request size {size}: p95 latency {p95:.0f} ms")
+
+        if p95 > latency_slo_ms:
+            break
+        chosen = size
+
+    tuning_cache[cache_key] = chosen
+    try:
+        cache_path = _tuning_cache_path()
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(tuning_cache, indent=2), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Could not save tuned request size: {e}")
+
+    logger.info(f"Using auto-tuned embed request size: {chosen}")
+    return chosen
@@ -1,20 +1,36 @@
 """Main indexing pipeline for codebases."""
 
 import logging
+import queue
+import threading
 import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 from tqdm import tqdm
 
-from config.settings import settings
-from src.chunking.file_chunker import FileChunker
+from config.settings import get_settings
+from src.chunking.file_chunker import FileChunker, default_chunk_workers
 from src.embeddings.ollama_embedder import OllamaEmbedder
+from src.indexing.batch_tuning import probe_optimal_batch_size
+from src.querying.semantic_cache import SemanticQueryCache
 from src.storage.lancedb_store import LanceDBStore
+from src.utils.exclude_matcher import ExcludeMatcher
 from src.utils.file_utils import FileFilter, count_files_by_extension
 
 logger = logging.getLogger(__name__)
 
+# Batches buffered between pipeline stages (chunking -> embedding -> storing)
+PIPELINE_QUEUE_SIZE = 2
+
+# Task prefix nomic-style embedding models expect on documents
+DOCUMENT_PREFIX = "search_document: "
+
 
 class CodebaseIndexer:
     """Index a codebase into a RAG database."""
@@ -26,6 +42,7 @@ class CodebaseIndexer:
         additional_exclude: Optional[list[str]] = None,
         max_file_size: Optional[int] = None,
         batch_size: Optional[int] = None,
+        exclude_matcher: Optional[ExcludeMatcher] = None,
     ):
         """Initialize codebase indexer.
 
@@ -35,15 +52,19 @@ class CodebaseIndexer:
             additional_exclude: Additional file patterns to exclude
             max_file_size: Maximum file size in bytes
             batch_size: Number of files to process in a batch
+            exclude_matcher: Precompiled matcher for default and additional patterns
         """
         self.codebase_path = Path(codebase_path)
         self.codebase_name = codebase_name
         self.additional_exclude = additional_exclude or []
-        self.batch_size = batch_size or settings.batch_size
 
         # Initialize components
-        self.file_filter = FileFilter(self.codebase_path, self.additional_exclude)
+        self.file_filter = FileFilter(
+            self.codebase_path, self.additional_exclude, exclude_matcher=exclude_matcher
+        )
         self.embedder = OllamaEmbedder()  # Create embedder first to get context_length
+        self.batch_size = batch_size or get_settings().batch_size
+        self._tune_request_size()
         self.file_chunker = FileChunker(
             max_file_size, max_chunk_tokens=self.embedder.context_length
         )
@@ -59,6 +80,7 @@ class CodebaseIndexer:
             "start_time": None,
             "end_time": None,
         }
+        self._stats_lock = threading.Lock()
 
     def index(self, show_progress: bool = True) -> dict:
         """Run the indexing pipeline.
@@ -74,28 +96,36 @@ class CodebaseIndexer:
 
         self.stats["start_time"] = time.time()
 
-        # Step 1: Discover files
+        # Step 1: Discover files (streamed: the walk continues while batches are indexed)
         logger.info("Step 1: Discovering files...")
-        files = self.file_filter.walk_files(show_progress=show_progress)
-        self.stats["total_files_found"] = len(files)
+        files = self.file_filter.iter_files(show_progress=show_progress)
 
-        if not files:
+        first_file = next(files, None)
+        if first_file is None:
             logger.warning("No files found to index!")
             return self.stats
 
-        # Show file distribution
-        ext_counts = count_files_by_extension(files)
-        logger.info(f"File distribution: {ext_counts}")
-
         # Step 2: Create table
         logger.info("Step 2: Creating/verifying database table...")
         self.store.create_table(self.codebase_name, embedding_dim=self.embedder.dimension)
 
         # Step 3: Process files in batches
         logger.info(f"Step 3: Processing files in batches of {self.batch_size}...")
-        self._process_files_in_batches(files, show_progress)
+        self._process_files_in_batches(chain((first_file,), files), show_progress)
 
         # Step 4: Finalize
+        # Built once all batches are in, so the index covers every row
+        self.store.ensure_vector_index(self.codebase_name)
+
+        if get_settings().enable_semantic_cache:
+            # Cached query results predate the new chunks
+            semantic_cache = SemanticQueryCache.open_default(
+                self.embedder.model, self.embedder.dimension
+            )
+            if semantic_cache is not None:
+                semantic_cache.invalidate(self.codebase_name)
+                semantic_cache.close()
+
         self.stats["end_time"] = time.time()
         duration = self.stats["end_time"] - self.stats["start_time"]
 
@@ -112,97 +142,230 @@ class CodebaseIndexer:
 
         return self.stats
 
-    def _process_files_in_batches(self, files: list[Path], show_progress: bool):
+    def _process_files_in_batches(self, files: Iterable[Path], show_progress: bool):
         """Process files in batches.
 
+        Runs as a three-stage pipeline so reading files, waiting on Ollama and
+        writing to LanceDB overlap: a worker thread chunks upcoming batches, the
+        calling thread embeds them, and a second worker stores finished ones.
+        Bounded queues between the stages keep at most a few batches in memory,
+        and files are consumed lazily, so a generator is never materialized.
+
         Args:
-            files: List of file paths to process
+            files: File paths to process
             show_progress: Whether to show progress bar
         """
-        total_batches = (len(files) + self.batch_size - 1) // self.batch_size
-
-        # Create progress bar if requested
+        # Create progress bar if requested (no total: files are still being found)
         if show_progress:
-            progress = tqdm(total=len(files), desc="Indexing files", unit="file")
+            progress = tqdm(desc="Indexing files", unit="file")
         else:
             progress = None
 
-        for batch_idx in range(total_batches):
-            start_idx = batch_idx * self.batch_size
-            end_idx = min(start_idx + self.batch_size, len(files))
-            batch_files = files[start_idx:end_idx]
+        chunk_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        store_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stop = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="indexer") as executor:
+            chunker = executor.submit(self._chunk_stage, files, chunk_queue, stop)
+            writer = executor.submit(self._store_stage, store_queue, progress)
+            try:
+                while (item := chunk_queue.get()) is not None:
+                    batch_files, chunks = item
+                    embeddings = self._embed_chunks(chunks) if chunks else None
+                    store_queue.put((batch_files, chunks, embeddings))
+            finally:
+                # Unblock the chunker if we stopped early, then drain the writer
+                stop.set()
+                store_queue.put(None)
+
+            chunker.result()
+            writer.result()
+
+        if progress:
+            progress.close()
+
+    def _chunk_stage(self, files: Iterable[Path], chunk_queue: queue.Queue, stop: threading.Event):
+        """Chunk files batch by batch and queue the results (pipeline stage 1).
+
+        Also counts the files found and logs their extension distribution.
+
+        Args:
+            files: File paths to process
+            chunk_queue: Queue receiving (batch files, chunks) items, then None
+            stop: Set when the consumer has stopped reading
+        """
+        files = iter(files)
+        ext_counts = {}
+
+        # Reading and splitting files is GIL-bound, so spread it over processes
+        workers = get_settings().chunk_workers or default_chunk_workers()
+        pool = self.file_chunker.chunk_pool(workers) if workers > 1 else None
+
+        try:
+            batch_idx = 0
+            while batch_files := list(islice(files, self.batch_size)):
+                batch_idx += 1
+                logger.debug(f"Processing batch {batch_idx}")
+
+                self._count("total_files_found", len(batch_files))
+                for ext, count in count_files_by_extension(batch_files).items():
+                    ext_counts[ext] = ext_counts.get(ext, 0) + count
+
+                try:
+                    batch_chunks = self._chunk_batch(batch_files, pool)
+                except BrokenProcessPool as e:
+                    # A worker died mid-batch; finish the run in this process
+                    logger.error(f"Chunking worker died ({e}), chunking in-process from now on")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = None
+                    batch_chunks = self._chunk_batch(batch_files)
+
+                if not self._put_until_stopped(chunk_queue, (batch_files, batch_chunks), stop):
+                    return
+        finally:
+            self._put_until_stopped(chunk_queue, None, stop)
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        # Show file distribution
+        logger.info(f"File distribution: {ext_counts}")
+
+    @staticmethod
+    def _put_until_stopped(item_queue: queue.Queue, item, stop: threading.Event) -> bool:
+        """Put an item on a bounded queue, giving up once its consumer has stopped.
 
-            logger.debug(f"Processing batch {batch_idx + 1}/{total_batches}")
+        Args:
+            item_queue: Queue to put the item on
+            item: Item to queue
+            stop: Set when the consumer has stopped reading
 
-            # Process batch
-            self._process_batch(batch_files)
+        Returns:
+            False if the consumer stopped before the item was queued
+        """
+        while not stop.is_set():
+            try:
+                item_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _store_stage(self, store_queue: queue.Queue, progress: Optional[tqdm]):
+        """Store embedded batches as they arrive (pipeline stage 3).
+
+        Args:
+            store_queue: Queue of (batch files, chunks, embeddings) items, then None
+            progress: Progress bar to advance per stored batch
+        """
+        while (item := store_queue.get()) is not None:
+            batch_files, chunks, embeddings = item
+            if embeddings is not None:
+                self._store_chunks(chunks, embeddings)
 
             # Update progress
             if progress:
                 progress.update(len(batch_files))
 
-        if progress:
-            progress.close()
+    def _count(self, stat: str, amount: int = 1):
+        """Add to an indexing statistic (called from several pipeline threads)."""
+        with self._stats_lock:
+            self.stats[stat] += amount
 
-    def _process_batch(self, batch_files: list[Path]):
-        """Process a batch of files.
+    def _chunk_batch(
+        self, batch_files: list[Path], pool: Optional[ProcessPoolExecutor] = None
+    ) -> list:
+        """Read a batch of files and create their chunks.
 
         Args:
             batch_files: List of file paths in this batch
+            pool: Worker pool to chunk the files in (default: this process)
+
+        Returns:
+            Chunks of all processed files in the batch
         """
-        # Step 1: Read files and create chunks
         chunks = []
-        for file_path in batch_files:
-            file_chunks = self.file_chunker.chunk_file(file_path, self.codebase_root)
-
+        batch_chunks = self.file_chunker.chunk_files(batch_files, self.codebase_root, pool)
+        for file_path, file_chunks in zip(batch_files, batch_chunks):
             if not file_chunks:  # Empty list means file was skipped
-                self.stats["files_skipped"] += 1
+                self._count("files_skipped")
                 logger.debug(f"Skipped: {file_path}")
                 continue
 
             # Add all chunks from this file
             chunks.extend(file_chunks)
-            self.stats["files_processed"] += 1
+            self._count("files_processed")
 
         if not chunks:
             logger.debug("No valid chunks in this batch")
-            return
+        return chunks
 
-        # Step 2: Generate embeddings for batch
+    def _embed_chunks(self, chunks: list) -> Optional[np.ndarray]:
+        """Generate embeddings for a batch of chunks.
+
+        Args:
+            chunks: Chunks to embed
+
+        Returns:
+            Embedding matrix with one row per chunk, or None if embedding failed
+        """
         try:
-            # Log which files are in this batch
-            batch_files = list(set(chunk["file_path"] for chunk in chunks))
-            logger.debug(
-                f"Processing batch of {len(chunks)} chunks from {len(batch_files)} files: {[str(f) for f in batch_files]}"
-            )
+            # Log which files are in this batch (building the list isn't free)
+            if logger.isEnabledFor(logging.DEBUG):
+                batch_source_files = dict.fromkeys(chunk["file_path"] for chunk in chunks)
+                logger.debug(
+                    "Processing batch of %d chunks from %d files",
+                    len(chunks),
+                    len(batch_source_files),
+                )
+                # The full file list only at a more verbose level than DEBUG
+                if logger.isEnabledFor(logging.DEBUG - 5):
+                    logger.log(logging.DEBUG - 5, "Batch files: %s", list(batch_source_files))
 
             # Add prefix if configured (required for nomic-embed-text, not needed for mxbai-embed-large)
-            if settings.use_embedding_prefixes:
-                texts = [f"search_document: {chunk['content']}" for chunk in chunks]
+            prefix = DOCUMENT_PREFIX if get_settings().use_embedding_prefixes else ""
+            if prefix:
+                texts = [prefix + chunk["content"] for chunk in chunks]
             else:
                 texts = [chunk["content"] for chunk in chunks]
 
             # Extract file paths for error logging
             identifiers = [chunk["file_path"] for chunk in chunks]
-            embeddings = self.embedder.embed_batch(texts, show_progress=False, identifiers=identifiers)
-
-            # Add embeddings to chunks
-            for chunk, embedding in zip(chunks, embeddings):
-                chunk["embedding"] = embedding
+            return self.embedder.embed_batch(texts, show_progress=False, identifiers=identifiers)
 
         except Exception as e:
             logger.error(f"Failed to generate embeddings for batch: {e}")
-            self.stats["files_failed"] += len(chunks)
-            return
+            self._count("files_failed", len(chunks))
+            return None
 
-        # Step 3: Store in database
+    def _store_chunks(self, chunks: list, embeddings: np.ndarray):
+        """Store a batch of embedded chunks in the database.
+
+        Args:
+            chunks: Chunks to store
+            embeddings: Embedding matrix with one row per chunk
+        """
         try:
-            count = self.store.insert_chunks(self.codebase_name, chunks)
-            self.stats["chunks_created"] += count
+            count = self.store.insert_chunks(self.codebase_name, chunks, embeddings)
+            self._count("chunks_created", count)
 
         except Exception as e:
             logger.error(f"Failed to store chunks: {e}")
-            self.stats["files_failed"] += len(chunks)
+            self._count("files_failed", len(chunks))
+
+    def _tune_request_size(self) -> None:
+        """Auto-tune the number of chunks per embed request, when enabled.
+
+        Latency is probed per request, so the result applies to the texts sent
+        to Ollama at once rather than to the files read per batch.
+        """
+        settings = get_settings()
+        if settings.auto_batch_size and not settings.embed_request_size_is_explicit:
+            try:
+                self.embedder.request_size = probe_optimal_batch_size(self.embedder)
+            except Exception as e:
+                logger.warning(
+                    f"Batch size auto-tuning failed, using {self.embedder.request_size}: {e}"
+                )
 
     @property
     def codebase_root(self) -> Path:
@@ -217,6 +380,7 @@ def index_codebase(
     max_file_size: Optional[int] = None,
     batch_size: Optional[int] = None,
     show_progress: bool = True,
+    exclude_matcher: Optional[ExcludeMatcher] = None,
 ) -> dict:
     """Index a codebase (convenience function).
 
@@ -227,6 +391,7 @@ def index_codebase(
         max_file_size: Maximum file size in bytes
         batch_size: Number of files to process in a batch
         show_progress: Whether to show progress bars
+        exclude_matcher: Precompiled matcher for default and additional patterns
 
     Returns:
         Dictionary with indexing statistics
@@ -237,6 +402,7 @@ def index_codebase(
         additional_exclude=additional_exclude,
         max_file_size=max_file_size,
         batch_size=batch_size,
+        exclude_matcher=exclude_matcher,
     )
 
     return indexer.index(show_progress=show_progress)
@@ -0,0 +1,135 @@
+"""Query engine searching several RAG databases at once."""
+
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+
+from config.settings import get_settings
+from src.embeddings.ollama_embedder import OllamaEmbedder
+from src.querying.query_engine import QueryEngine
+from src.storage.lancedb_store import LanceDBStore
+
+logger = logging.getLogger(__name__)
+
+
+class MultiQueryEngine:
+    """Engine for querying several RAG databases with one question.
+
+    The query is embedded once and the databases are searched concurrently
+    (LanceDB releases the GIL while searching), so latency is that of the
+    slowest database rather than the sum of all of them.
+    """
+
+    def __init__(
+        self,
+        database_names: list[str],
+        embedder: Optional[OllamaEmbedder] = None,
+        store: Optional[LanceDBStore] = None,
+    ):
+        """Initialize multi-database query engine.
+
+        Args:
+            database_names: Names of the codebase databases
+            embedder: Optional embedder instance (creates new if None)
+            store: Optional store instance (creates new if None)
+
+        Raises:
+            ValueError: If no databases are given or one doesn't exist
+        """
+        if not database_names:
+            raise ValueError("At least one database is required")
+
+        self.embedder = embedder or OllamaEmbedder()
+        self.store = store or LanceDBStore()
+        # One engine per database, all sharing the embedder and store
+        self.engines = {
+            name: QueryEngine(name, embedder=self.embedder, store=self.store)
+            for name in dict.fromkeys(database_names)
+        }
+
+        logger.info(f"Initialized MultiQueryEngine for databases: {list(self.engines)}")
+
+    def query(
+        self,
+        query_text: str,
+        limit: int = None,
+        min_similarity: Optional[float] = None,
+        extension_filter: Optional[str] = None,
+    ) -> list[dict]:
+        """Query all databases and merge the results.
+
+        Args:
+            query_text: Natural language query
+            limit: Maximum number of results overall (default from settings)
+            min_similarity: Minimum similarity threshold (0-1)
+            extension_filter: Filter by file extension (e.g., '.py')
+
+        Returns:
+            The most similar results across databases, each with a 'database'
+            field naming where it came from
+        """
+        if not query_text or not query_text.strip():
+            logger.warning("Empty query provided")
+            return []
+
+        settings = get_settings()
+        limit = limit if limit is not None else settings.default_search_limit
+        min_similarity = (
+            min_similarity if min_similarity is not None else settings.similarity_threshold
+        )
+        if limit <= 0 or min_similarity > 1:
+            return []
+
+        logger.info(f"Querying {len(self.engines)} databases: '{query_text}' (limit={limit})")
+
+        try:
+            query_embedding = self.embedder.embed(QueryEngine.query_to_embed(query_text))
+        except Exception as e:
+            logger.error(f"Failed to generate query embedding: {e}")
+            raise
+
+        if not np.any(query_embedding):
+            logger.warning(f"Query embedding for '{query_text}' is a zero vector")
+            return []
+
+        def search(item: tuple[str, QueryEngine]) -> list[dict]:
+            name, engine = item
+            results = engine.search_embedding(
+                query_embedding, limit, min_similarity, extension_filter
+            )
+            for result in results:
+                result["database"] = name
+            return results
+
+        # Each database contributes at most `limit` results; keep the best overall
+        workers = min(len(self.engines), settings.query_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            per_database = list(executor.map(search, self.engines.items()))
+
+        results = heapq.nlargest(
+            limit, chain.from_iterable(per_database), key=lambda r: r["similarity"]
+        )
+        logger.info(f"Found {len(results)} results above similarity threshold {min_similarity}")
+        return results
+
+    def format_results(self, results: list[dict], style: str = "human", **kwargs) -> str:
+        """Format merged results (see QueryEngine.format_results).
+
+        Args:
+            results: List of result dictionaries
+            style: Format style ('human' or 'machine')
+            **kwargs: Passed on to QueryEngine.format_results
+
+        Returns:
+            Formatted string
+        """
+        return next(iter(self.engines.values())).format_results(results, style=style, **kwargs)
+
+    def close(self) -> None:
+        """Close the engines' query caches."""
+        for engine in self.engines.values():
+            engine.close()
@@ -1,14 +1,38 @@
 """Query engine for searching RAG databases."""
 
+import asyncio
+import io
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, partial
 from typing import Optional
 
-from config.settings import settings
+import numpy as np
+
+from config.settings import get_settings
 from src.embeddings.ollama_embedder import OllamaEmbedder
+from src.querying.semantic_cache import SemanticCache, SemanticQueryCache
 from src.storage.lancedb_store import LanceDBStore
 
 logger = logging.getLogger(__name__)
 
+# Maximum threads searching the database at once in query_many
+SEARCH_MAX_WORKERS = 8
+
+# Separators in human-readable output, with the blank lines around them
+SECTION_RULE = "\n\n" + "=" * 60 + "\n"
+RESULT_RULE = "\n\n" + "-" * 60 + "\n"
+
+# Per-result lines of the human-readable summary and machine-readable header
+HUMAN_SUMMARY = "\n{idx}. {location}\n   Similarity: {similarity:.3f} | Size: {size_bytes} bytes"
+MACHINE_HEADER = "\n\n## {idx}. {location}\n**Relevance:** {similarity:.2%} | **Type:** {extension}"
+
+
+@cache
+def _query_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all aquery() calls in the process."""
+    return ThreadPoolExecutor(max_workers=get_settings().query_workers, thread_name_prefix="query")
+
 
 class QueryEngine:
     """Engine for querying RAG databases."""
@@ -34,8 +58,51 @@ class QueryEngine:
         if not self.store.table_exists(database_name):
             raise ValueError(f"Database '{database_name}' does not exist")
 
+        settings = get_settings()
+        self.semantic_cache = (
+            SemanticQueryCache.open_default(self.embedder.model, self.embedder.dimension)
+            if settings.enable_semantic_cache
+            else None
+        )
+
+        # In-memory tier in front of the persistent cache
+        self.memory_cache = None
+        if settings.enable_semantic_cache and settings.semantic_cache_memory_entries > 0:
+            self.memory_cache = SemanticCache(
+                self.embedder.model,
+                self.embedder.dimension,
+                threshold=settings.semantic_cache_threshold,
+                ttl_seconds=settings.semantic_cache_ttl_seconds,
+                max_entries=settings.semantic_cache_memory_entries,
+            )
+        # Table version seen by the last query; part of every cache key, so results
+        # cached before the table was re-indexed are never served
+        self._table_version = None
+
         logger.info(f"Initialized QueryEngine for database: {database_name}")
 
+    def close(self) -> None:
+        """Close the persistent query cache (the embedder and store are left open)."""
+        if self.semantic_cache is not None:
+            self.semantic_cache.close()
+
+    def __enter__(self) -> "QueryEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def warmup(self) -> None:
+        """Send a tiny embedding request so Ollama loads the model ahead of a query.
+
+        Meant to run in a background thread while the caller does other work;
+        failures are logged and otherwise ignored.
+        """
+        try:
+            self.embedder.warmup()
+        except Exception as e:
+            logger.debug(f"Warm-up embedding failed: {e}")
+
     def query(
         self,
         query_text: str,
@@ -60,52 +127,298 @@ class QueryEngine:
             logger.warning("Empty query provided")
             return []
 
-        limit = limit if limit is not None else settings.default_search_limit
-        min_similarity = (
-            min_similarity if min_similarity is not None else settings.similarity_threshold
-        )
+        limit, min_similarity = self._resolve_params(limit, min_similarity)
 
         logger.info(f"Querying: '{query_text}' (limit={limit})")
 
-        # Step 1: Generate query embedding
-        # Add prefix if configured (required for nomic-embed-text, not needed for mxbai-embed-large)
-        if settings.use_embedding_prefixes:
-            query_to_embed = f"search_query: {query_text}"
-        else:
-            query_to_embed = query_text
+        if not self._can_match(limit, min_similarity):
+            return []
+
+        # Results depend on these as well as on the query itself
+        cache_params = self._cache_params(limit, min_similarity, extension_filter)
+        cached = self._get_cached_exact(cache_params, query_text)
+        if cached is not None:
+            return cached
 
+        # Step 1: Generate query embedding
         try:
-            query_embedding = self.embedder.embed(query_to_embed)
+            query_embedding = self.embedder.embed(self.query_to_embed(query_text))
         except Exception as e:
             logger.error(f"Failed to generate query embedding: {e}")
             raise
 
-        # Step 2: Build filters
+        # A zero vector has no direction, so there is nothing to rank by
+        if not np.any(query_embedding):
+            logger.warning(f"Query embedding for '{query_text}' is a zero vector")
+            return []
+
+        cached = self._get_cached_similar(cache_params, query_text, query_embedding)
+        if cached is not None:
+            return cached
+
+        # Step 2: Search database
+        results = self.search_embedding(query_embedding, limit, min_similarity, extension_filter)
+
+        logger.info(f"Found {len(results)} results above similarity threshold {min_similarity}")
+
+        self._put_cached(cache_params, query_text, query_embedding, results)
+        return results
+
+    async def aquery(
+        self,
+        query_text: str,
+        limit: int = None,
+        min_similarity: Optional[float] = None,
+        extension_filter: Optional[str] = None,
+    ) -> list[dict]:
+        """Query the RAG database without blocking the event loop.
+
+        The query (embedding round-trip and search) runs on a shared thread
+        pool, so several queries can be awaited together with
+        ``asyncio.gather`` while the caller keeps rendering.
+
+        Args:
+            query_text: Natural language query
+            limit: Maximum number of results (default from settings)
+            min_similarity: Minimum similarity threshold (0-1)
+            extension_filter: Filter by file extension (e.g., '.py')
+
+        Returns:
+            List of matching results
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _query_executor(),
+            partial(
+                self.query,
+                query_text,
+                limit=limit,
+                min_similarity=min_similarity,
+                extension_filter=extension_filter,
+            ),
+        )
+
+    def query_many(
+        self,
+        query_texts: list[str],
+        limit: int = None,
+        min_similarity: Optional[float] = None,
+        extension_filter: Optional[str] = None,
+    ) -> list[list[dict]]:
+        """Query the RAG database with several queries at once.
+
+        All query embeddings are requested from Ollama in one batch, and the
+        searches then run concurrently.
+
+        Args:
+            query_texts: Natural language queries
+            limit: Maximum number of results per query (default from settings)
+            min_similarity: Minimum similarity threshold (0-1)
+            extension_filter: Filter by file extension (e.g., '.py')
+
+        Returns:
+            One list of matching results per query, in the order of query_texts
+            (empty for empty queries and queries that couldn't be embedded)
+        """
+        results = [[] for _ in query_texts]
+        limit, min_similarity = self._resolve_params(limit, min_similarity)
+
+        logger.info(f"Querying {len(query_texts)} queries (limit={limit})")
+
+        if not self._can_match(limit, min_similarity):
+            return results
+
+        cache_params = self._cache_params(limit, min_similarity, extension_filter)
+        pending = []
+        for idx, query_text in enumerate(query_texts):
+            if not query_text or not query_text.strip():
+                logger.warning("Empty query provided")
+                continue
+            cached = self._get_cached_exact(cache_params, query_text)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                pending.append(idx)
+
+        if not pending:
+            return results
+
+        # Step 1: Generate all query embeddings in one batch
+        embeddings = self.embedder.embed_batch(
+            [self.query_to_embed(query_texts[idx]) for idx in pending]
+        )
+
+        to_search = []
+        for idx, embedding in zip(pending, embeddings):
+            # Rows of texts that failed to embed are zero
+            if not embedding.any():
+                logger.error(f"Failed to generate query embedding for: '{query_texts[idx]}'")
+                continue
+            embedding = embedding.tolist()
+            cached = self._get_cached_similar(cache_params, query_texts[idx], embedding)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                to_search.append((idx, embedding))
+
+        # Step 2: Search database concurrently (LanceDB releases the GIL)
+        if to_search:
+            workers = min(SEARCH_MAX_WORKERS, len(to_search))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                searches = executor.map(
+                    lambda item: self.search_embedding(
+                        item[1], limit, min_similarity, extension_filter
+                    ),
+                    to_search,
+                )
+                for (idx, embedding), found in zip(to_search, searches):
+                    results[idx] = found
+                    self._put_cached(cache_params, query_texts[idx], embedding, found)
+
+        return results
+
+    def _resolve_params(
+        self, limit: Optional[int], min_similarity: Optional[float]
+    ) -> tuple[int, float]:
+        """Fill in the default limit and similarity threshold."""
+        settings = get_settings()
+        limit = limit if limit is not None else settings.default_search_limit
+        min_similarity = (
+            min_similarity if min_similarity is not None else settings.similarity_threshold
+        )
+        return limit, min_similarity
+
+    def _can_match(self, limit: int, min_similarity: float) -> bool:
+        """Check whether any result could qualify, before paying for an embedding.
+
+        Also records the table's version for the cache keys, and drops cached
+        results if the table changed since the last query (e.g. re-indexed by
+        another process).
+
+        Args:
+            limit: Maximum number of results
+            min_similarity: Minimum similarity threshold
+
+        Returns:
+            False if the search is known to return nothing
+        """
+        # Similarity is cosine similarity, so it never exceeds 1
+        if min_similarity > 1 or limit <= 0:
+            logger.info(f"No results possible with min_similarity={min_similarity}, limit={limit}")
+            return False
+        row_count = self.store.count_rows(self.database_name)
+        if row_count == 0:
+            logger.info(f"Database '{self.database_name}' is empty")
+            return False
+
+        table_version = self.store.table_version(self.database_name)
+        if self._table_version is not None and table_version != self._table_version:
+            for result_cache in (self.memory_cache, self.semantic_cache):
+                if result_cache is not None:
+                    result_cache.invalidate(self.database_name)
+        self._table_version = table_version
+        return True
+
+    def _cache_params(
+        self, limit: int, min_similarity: float, extension_filter: Optional[str]
+    ) -> str:
+        """Cache key part for the search parameters and table version (see _can_match)."""
+        return f"{self._table_version}|{limit}|{min_similarity}|{extension_filter or ''}"
+
+    @staticmethod
+    def query_to_embed(query_text: str) -> str:
+        """Add the query prefix if configured.
+
+        Required for nomic-embed-text, not needed for mxbai-embed-large.
+        """
+        if get_settings().use_embedding_prefixes:
+            return f"search_query: {query_text}"
+        return query_text
+
+    def _get_cached_exact(self, cache_params: str, query_text: str) -> Optional[list[dict]]:
+        """Look up results for the same query text, in memory and then on disk."""
+        for result_cache in (self.memory_cache, self.semantic_cache):
+            if result_cache is None:
+                continue
+            cached = result_cache.get_exact(self.database_name, cache_params, query_text)
+            if cached is not None:
+                logger.info(f"Found {len(cached)} cached results for the same query")
+                return cached
+        return None
+
+    def _get_cached_similar(
+        self, cache_params: str, query_text: str, query_embedding: list[float]
+    ) -> Optional[list[dict]]:
+        """Look up results for a similar query, in memory and then on disk."""
+        if self.memory_cache is not None:
+            cached = self.memory_cache.get_similar(
+                self.database_name, cache_params, query_embedding
+            )
+            if cached is not None:
+                logger.info(f"Found {len(cached)} cached results for a similar query")
+                return cached
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get_similar(
+                self.database_name, cache_params, query_embedding
+            )
+            if cached is not None:
+                logger.info(f"Found {len(cached)} cached results for a similar query")
+                if self.memory_cache is not None:
+                    self.memory_cache.put(
+                        self.database_name, cache_params, query_text, query_embedding, cached
+                    )
+                return cached
+        return None
+
+    def _put_cached(
+        self, cache_params: str, query_text: str, query_embedding: list[float], results: list[dict]
+    ) -> None:
+        """Store search results in the enabled caches."""
+        for result_cache in (self.memory_cache, self.semantic_cache):
+            if result_cache is not None:
+                result_cache.put(
+                    self.database_name, cache_params, query_text, query_embedding, results
+                )
+
+    def search_embedding(
+        self,
+        query_embedding: list[float],
+        limit: int,
+        min_similarity: float,
+        extension_filter: Optional[str] = None,
+    ) -> list[dict]:
+        """Search the database with an already computed query embedding.
+
+        Results are filtered by similarity threshold inside LanceDB and are
+        not cached.
+
+        Args:
+            query_embedding: Query embedding vector
+            limit: Maximum number of results
+            min_similarity: Minimum similarity threshold
+            extension_filter: Optional file extension to filter by
+
+        Returns:
+            List of matching results
+        """
         filters = None
         if extension_filter:
             filters = f"extension = '{extension_filter}'"
 
-        # Step 3: Search database
+        # Cosine distance is 1 - similarity and never exceeds 2
+        max_distance = 1 - min_similarity if min_similarity > -1 else None
         try:
-            results = self.store.search(
+            return self.store.search(
                 codebase_name=self.database_name,
                 query_embedding=query_embedding,
                 limit=limit,
                 filters=filters,
+                max_distance=max_distance,
             )
         except Exception as e:
             logger.error(f"Search failed: {e}")
             raise
 
-        # Step 4: Filter by similarity threshold
-        filtered_results = [r for r in results if r["similarity"] >= min_similarity]
-
-        logger.info(
-            f"Found {len(filtered_results)} results above similarity threshold {min_similarity}"
-        )
-
-        return filtered_results
-
     def format_results(
         self,
         results: list[dict],
@@ -130,6 +443,25 @@ class QueryEngine:
         else:
             return self._format_human(results, max_content_length)
 
+    @staticmethod
+    def _describe_location(result: dict) -> str:
+        """File path of a result with its line range (and chunk, if chunked)."""
+        total_chunks = result.get("total_chunks") or 1
+        start_line = result.get("start_line") or 1
+        end_line = result.get("end_line") or 1
+
+        if total_chunks > 1:
+            chunk_index = result.get("chunk_index") or 0
+            return f"{result['file_path']} (lines {start_line}-{end_line}, chunk {chunk_index + 1}/{total_chunks})"
+        return f"{result['file_path']} (lines {start_line}-{end_line})"
+
+    @staticmethod
+    def _truncate(content: str, max_length: Optional[int]) -> str:
+        """Cut content down to max_length characters, marking the cut."""
+        if max_length and len(content) > max_length:
+            return content[:max_length] + "\n... (truncated)"
+        return content
+
     def _format_human(self, results: list[dict], max_length: Optional[int]) -> str:
         """Format results in human-readable style.
 
@@ -140,56 +472,32 @@ class QueryEngine:
         Returns:
             Formatted string
         """
-        output = []
-        output.append(f"Found {len(results)} relevant files:\n")
+        buffer = io.StringIO()
+        write = buffer.write
+        write(f"Found {len(results)} relevant files:\n")
 
-        # First, list all files with metadata
-        for idx, result in enumerate(results, 1):
-            # Show file path with line numbers if chunked
-            total_chunks = result.get("total_chunks") or 1
-            start_line = result.get("start_line") or 1
-            end_line = result.get("end_line") or 1
-            chunk_index = result.get("chunk_index") or 0
+        locations = [self._describe_location(result) for result in results]
 
-            if total_chunks > 1:
-                file_display = f"{result['file_path']} (lines {start_line}-{end_line}, chunk {chunk_index + 1}/{total_chunks})"
-            elif start_line and end_line:
-                file_display = f"{result['file_path']} (lines {start_line}-{end_line})"
-            else:
-                file_display = result["file_path"]
-
-            output.append(f"{idx}. {file_display}")
-            output.append(
-                f"   Similarity: {result['similarity']:.3f} | Size: {result['size_bytes']} bytes"
+        # First, list all files with metadata
+        for idx, (result, location) in enumerate(zip(results, locations), 1):
+            write(
+                HUMAN_SUMMARY.format(
+                    idx=idx,
+                    location=location,
+                    similarity=result["similarity"],
+                    size_bytes=result["size_bytes"],
+                )
             )
 
-        output.append("\n" + "=" * 60 + "\n")
+        write(SECTION_RULE)
 
         # Then show full content for each file
-        for idx, result in enumerate(results, 1):
-            # Show file path with line numbers
-            total_chunks = result.get("total_chunks") or 1
-            start_line = result.get("start_line") or 1
-            end_line = result.get("end_line") or 1
-            chunk_index = result.get("chunk_index") or 0
-
-            if total_chunks > 1:
-                header = f"## {idx}. {result['file_path']} (lines {start_line}-{end_line}, chunk {chunk_index + 1}/{total_chunks})\n"
-            elif start_line and end_line:
-                header = f"## {idx}. {result['file_path']} (lines {start_line}-{end_line})\n"
-            else:
-                header = f"## {idx}. {result['file_path']}\n"
-
-            output.append(header)
-
-            content = result["content"]
-            if max_length and len(content) > max_length:
-                content = content[:max_length] + "\n... (truncated)"
+        for idx, (result, location) in enumerate(zip(results, locations), 1):
+            write(f"\n## {idx}. {location}\n\n")
+            write(self._truncate(result["content"], max_length))
+            write(RESULT_RULE)
 
-            output.append(content)
-            output.append("\n" + "-" * 60 + "\n")
-
-        return "\n".join(output)
+        return buffer.getvalue()
 
     def _format_for_machine(self, results: list[dict], max_length: Optional[int]) -> str:
         """Format results optimized for machine consumption.
@@ -201,37 +509,24 @@ class QueryEngine:
         Returns:
             Formatted string
         """
-        output = []
-        output.append(f"Found {len(results)} relevant files:\n")
+        buffer = io.StringIO()
+        write = buffer.write
+        write(f"Found {len(results)} relevant files:\n")
 
         for idx, result in enumerate(results, 1):
-            # Show file path with line numbers
-            total_chunks = result.get("total_chunks") or 1
-            start_line = result.get("start_line") or 1
-            end_line = result.get("end_line") or 1
-            chunk_index = result.get("chunk_index") or 0
-
-            if total_chunks > 1:
-                header = f"\n## {idx}. {result['file_path']} (lines {start_line}-{end_line}, chunk {chunk_index + 1}/{total_chunks})"
-            elif start_line and end_line:
-                header = f"\n## {idx}. {result['file_path']} (lines {start_line}-{end_line})"
-            else:
-                header = f"\n## {idx}. {result['file_path']}"
-
-            output.append(header)
-            output.append(
-                f"**Relevance:** {result['similarity']:.2%} | **Type:** {result['extension']}"
+            write(
+                MACHINE_HEADER.format(
+                    idx=idx,
+                    location=self._describe_location(result),
+                    similarity=result["similarity"],
+                    extension=result["extension"],
+                )
             )
-            output.append("\n```")
-
-            content = result["content"]
-            if max_length and len(content) > max_length:
-                content = content[:max_length] + "\n... (truncated)"
-
-            output.append(content)
-            output.append("```\n")
+            write("\n\n```\n")
+            write(self._truncate(result["content"], max_length))
+            write("\n```\n")
 
-        return "\n".join(output)
+        return buffer.getvalue()
 
 
 def query_database(
@@ -0,0 +1,445 @@
+"""Caches of query results, matched by query text or embedding similarity."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config.settings import get_settings
+
+try:
+    import sqlite_vec
+except ImportError:  # optional: sqlite-vec ranks cached queries inside SQLite
+    sqlite_vec = None
+
+logger = logging.getLogger(__name__)
+
+# Fixed seed so the random projections (and thus buckets) are reproducible
+LSH_SEED = 0
+
+
+def _normalize_query(query_text: str) -> str:
+    """Normalize query text for exact matching (case and whitespace insensitive)."""
+    return " ".join(query_text.lower().split())
+
+
+class SemanticCache:
+    """In-memory cache of search results with locality-sensitive hashing.
+
+    Exact repeats are found by normalized query text before anything is
+    embedded. Near-duplicates are found by hashing the query embedding with
+    ``n_tables`` sets of ``n_bits`` random hyperplanes: queries landing in
+    the same bucket of any table are candidates, and a candidate is a hit
+    when its cosine similarity is at least the threshold. Entries are
+    namespaced by embedding model, codebase and search parameters, expire
+    after a TTL, and the oldest are evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        dimension: int,
+        n_tables: int = 8,
+        n_bits: int = 16,
+        threshold: float = 0.97,
+        ttl_seconds: float = 3600,
+        max_entries: int = 256,
+    ):
+        """Create an empty cache.
+
+        Args:
+            model: Embedding model the query vectors come from
+            dimension: Embedding dimension of query vectors
+            n_tables: Number of hash tables (more = better recall)
+            n_bits: Hyperplanes per table (more = smaller buckets)
+            threshold: Minimum cosine similarity for a near-duplicate hit
+            ttl_seconds: Age after which entries are ignored
+            max_entries: Entries kept before the oldest are evicted
+        """
+        self.model = model
+        self.dimension = dimension
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Prefixed to params, so vectors from another model never share a key
+        self._namespace = f"{model}\0{dimension}\0"
+
+        rng = np.random.default_rng(LSH_SEED)
+        # One (dimension, n_tables * n_bits) matrix so hashing is a single matmul
+        self._projections = rng.standard_normal((dimension, n_tables * n_bits)).astype(np.float32)
+        self._n_tables = n_tables
+        self._bit_weights = 1 << np.arange(n_bits, dtype=np.uint64)
+
+        # Guards all state below; the query daemon serves queries from several threads
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # id -> (codebase, params, text, unit vector, bucket keys, results, created)
+        self._entries: OrderedDict[int, tuple] = OrderedDict()
+        self._exact: dict[tuple[str, str, str], int] = {}
+        self._buckets: dict[tuple, list[int]] = {}
+
+    def _unit(self, embedding: list[float]) -> Optional[np.ndarray]:
+        """Embedding as a float32 unit vector, or None for a zero vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _bucket_keys(self, codebase: str, params: str, unit: np.ndarray) -> list[tuple]:
+        """Bucket of a vector in every hash table, namespaced by codebase and params."""
+        bits = (unit @ self._projections > 0).reshape(self._n_tables, -1)
+        hashes = bits.astype(np.uint64) @ self._bit_weights
+        return [(codebase, params, table, int(h)) for table, h in enumerate(hashes)]
+
+    def _live(self, entry_id: int, now: float) -> Optional[tuple]:
+        """Entry by id if it exists and hasn't expired (caller holds the lock)."""
+        entry = self._entries.get(entry_id)
+        if entry is None or now - entry[6] > self.ttl_seconds:
+            return None
+        return entry
+
+    def get_exact(self, codebase: str, params: str, query_text: str) -> Optional[list[dict]]:
+        """Look up results for the same query text (no embedding needed).
+
+        Args:
+            codebase: Name of the codebase
+            params: Search parameters the results depend on
+            query_text: Query text
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        key = (codebase, self._namespace + params, _normalize_query(query_text))
+        with self._lock:
+            entry_id = self._exact.get(key)
+            entry = self._live(entry_id, time.time()) if entry_id is not None else None
+            return entry[5] if entry is not None else None
+
+    def get_similar(
+        self, codebase: str, params: str, embedding: list[float]
+    ) -> Optional[list[dict]]:
+        """Look up results for the most similar earlier query sharing a bucket.
+
+        Args:
+            codebase: Name of the codebase
+            params: Search parameters the results depend on
+            embedding: Query embedding
+
+        Returns:
+            Cached results if a candidate is within the similarity threshold,
+            otherwise None
+        """
+        unit = self._unit(embedding)
+        if unit is None:
+            return None
+
+        now = time.time()
+        best_similarity = self.threshold
+        best = None
+        with self._lock:
+            candidates = set()
+            for key in self._bucket_keys(codebase, self._namespace + params, unit):
+                candidates.update(self._buckets.get(key, ()))
+            for entry_id in candidates:
+                entry = self._live(entry_id, now)
+                if entry is None:
+                    continue
+                similarity = float(unit @ entry[3])
+                if similarity >= best_similarity:
+                    best_similarity = similarity
+                    best = entry[5]
+        return best
+
+    def put(
+        self,
+        codebase: str,
+        params: str,
+        query_text: str,
+        embedding: list[float],
+        results: list[dict],
+    ) -> None:
+        """Store results for a query.
+
+        Args:
+            codebase: Name of the codebase
+            params: Search parameters the results depend on
+            query_text: Query text
+            embedding: Query embedding
+            results: Search results to cache
+        """
+        unit = self._unit(embedding)
+        params = self._namespace + params
+        exact_key = (codebase, params, _normalize_query(query_text))
+        bucket_keys = self._bucket_keys(codebase, params, unit) if unit is not None else []
+
+        with self._lock:
+            old_id = self._exact.get(exact_key)
+            if old_id is not None:
+                self._remove(old_id)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (
+                codebase,
+                params,
+                exact_key[2],
+                unit,
+                bucket_keys,
+                results,
+                time.time(),
+            )
+            self._exact[exact_key] = entry_id
+            for key in bucket_keys:
+                self._buckets.setdefault(key, []).append(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        """Drop an entry from every index (caller holds the lock)."""
+        codebase, params, text, _, bucket_keys, _, _ = self._entries.pop(entry_id)
+        self._exact.pop((codebase, params, text), None)
+        for key in bucket_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.remove(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def invalidate(self, codebase: str) -> None:
+        """Drop all cached results for a codebase.
+
+        Args:
+            codebase: Name of the codebase
+        """
+        with self._lock:
+            for entry_id in [i for i, e in self._entries.items() if e[0] == codebase]:
+                self._remove(entry_id)
+
+
+class SemanticQueryCache:
+    """SQLite-backed cache of search results for earlier queries.
+
+    A query hits the cache when the same text was asked before, or when its
+    embedding's cosine similarity to an earlier query's is at least the
+    threshold (paraphrases like "what does X do" / "how does X work").
+    Entries are namespaced by embedding model, codebase and search
+    parameters and expire after a TTL; re-indexing a codebase invalidates
+    its entries.
+    """
+
+    def __init__(
+        self, path: Path, model: str, dimension: int, threshold: float, ttl_seconds: float
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file
+            model: Embedding model the query vectors come from
+            dimension: Embedding dimension of cached query vectors
+            threshold: Minimum cosine similarity for a near-duplicate hit
+            ttl_seconds: Age after which entries are ignored
+        """
+        self.path = path
+        self.model = model
+        self.dimension = dimension
+        # Prefixed to the stored params, so entries embedded by another model (or at
+        # another dimension) never match: their vectors aren't comparable
+        self._namespace = f"{model}\0{dimension}\0"
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared across threads (the query daemon); every access goes through _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._has_vec = False
+        if sqlite_vec is not None:
+            try:
+                self._conn.enable_load_extension(True)
+                sqlite_vec.load(self._conn)
+                self._conn.enable_load_extension(False)
+                self._has_vec = True
+            except (AttributeError, sqlite3.Error) as e:
+                logger.debug(f"sqlite-vec unavailable, ranking cached queries with numpy: {e}")
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "id INTEGER PRIMARY KEY, codebase TEXT NOT NULL, params TEXT NOT NULL, "
+                "text_key BLOB NOT NULL, embedding BLOB NOT NULL, results TEXT NOT NULL, "
+                "created REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS queries_lookup ON queries (codebase, params, text_key)"
+            )
+            self._conn.commit()
+
+    @classmethod
+    def open_default(cls, model: str, dimension: int) -> Optional["SemanticQueryCache"]:
+        """Open the per-user cache in the state directory.
+
+        Args:
+            model: Embedding model name
+            dimension: Embedding dimension of the query model
+
+        Returns:
+            SemanticQueryCache, or None if it can't be opened
+        """
+        settings = get_settings()
+        path = settings.state_dir / "query_cache.db"
+        try:
+            return cls(
+                path,
+                model,
+                dimension,
+                settings.semantic_cache_threshold,
+                settings.semantic_cache_ttl_seconds,
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic query cache disabled, could not open {path}: {e}")
+            return None
+
+    @staticmethod
+    def _text_key(query_text: str) -> bytes:
+        """Key for exact matches, insensitive to case and surrounding/repeated whitespace."""
+        return hashlib.blake2b(
+            _normalize_query(query_text).encode("utf-8"), digest_size=16
+        ).digest()
+
+    def get_exact(self, codebase: str, params: str, query_text: str) -> Optional[list[dict]]:
+        """Look up results for the same query text (no embedding needed).
+
+        Args:
+            codebase: Name of the codebase
+            params: Search parameters the results depend on
+            query_text: Query text
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results FROM queries WHERE codebase = ? AND params = ? AND text_key = ? "
+                "AND created >= ? ORDER BY created DESC LIMIT 1",
+                (
+                    codebase,
+                    self._namespace + params,
+                    self._text_key(query_text),
+                    time.time() - self.ttl_seconds,
+                ),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_similar(
+        self, codebase: str, params: str, embedding: list[float]
+    ) -> Optional[list[dict]]:
+        """Look up results for the most similar earlier query.
+
+        Args:
+            codebase: Name of the codebase
+            params: Search parameters the results depend on
+            embedding: Query embedding
+
+        Returns:
+            Cached results if the nearest earlier query is within the
+            similarity threshold, otherwise None
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        since = time.time() - self.ttl_seconds
+        params = self._namespace + params
+
+        with self._lock:
+            if self._has_vec:
+                row = self._conn.execute(
+                    "SELECT results, vec_distance_cosine(embedding, ?) AS distance FROM queries "
+                    "WHERE codebase = ? AND params = ? AND created >= ? "
+                    "ORDER BY distance LIMIT 1",
+                    (query.tobytes(), codebase, params, since),
+                ).fetchone()
+                if row is None or 1 - row[1] < self.threshold:
+                    return None
+                return json.loads(row[0])
+
+            rows = self._conn.execute(
+                "SELECT results, embedding FROM queries "
+                "WHERE codebase = ? AND params = ? AND created >= ?",
+                (codebase, params, since),
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        vectors = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32)
+        vectors = vectors.reshape(len(rows), self.dimension)
+        norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+        similarities = vectors @ query / np.where(norms == 0, 1.0, norms)
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            return None
+        return json.loads(rows[best][0])
+
+    def put(
+        self,
+        codebase: str,
+        params: str,
+        query_text: str,
+        embedding: list[float],
+        results: list[dict],
+    ) -> None:
+        """Store results for a query.
+
+        Args:
+            codebase: Name of the codebase
+            params: Search parameters the results depend on
+            query_text: Query text
+            embedding: Query embedding
+            results: Search results to cache
+        """
+        vector = np.asarray(embedding, dtype=np.float32).tobytes()
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "DELETE FROM queries WHERE created < ?",
+                        (time.time() - self.ttl_seconds,),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO queries (codebase, params, text_key, embedding, results, created) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            codebase,
+                            self._namespace + params,
+                            self._text_key(query_text),
+                            vector,
+                            json.dumps(results),
+                            time.time(),
+                        ),
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not save query results to cache: {e}")
+
+    def invalidate(self, codebase: str) -> None:
+        """Drop all cached results for a codebase (e.g. after re-indexing it).
+
+        Args:
+            codebase: Name of the codebase
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM queries WHERE codebase = ?", (codebase,))
+            except sqlite3.Error as e:
+                logger.warning(f"Could not invalidate query cache for '{codebase}': {e}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
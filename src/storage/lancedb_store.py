@@ -3,35 +3,169 @@
 import hashlib
 import logging
 import re
-from datetime import datetime
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
 import lancedb
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 
-from config.settings import settings
+from config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Maximum threads used to compute stats for several tables at once
+STATS_MAX_WORKERS = 8
+
+# Characters replaced when turning a codebase name into a table name
+UNSAFE_NAME_CHARS = re.compile(r"[^\w\-]")
+REPEATED_UNDERSCORES = re.compile(r"_+")
+
+# Columns returned by search() by default (everything except the vector)
+SEARCH_COLUMNS = (
+    "id",
+    "file_path",
+    "absolute_path",
+    "content",
+    "extension",
+    "size_bytes",
+    "modified_at",
+    "language",
+    "start_line",
+    "end_line",
+    "chunk_index",
+    "total_chunks",
+)
+
+# How stale an open table may get before it checks for writes by other processes
+# (0 = on every read, which is still far cheaper than reopening the table)
+READ_CONSISTENCY_INTERVAL = timedelta(0)
+
+# Arrow value types for the vector_dtype setting
+VECTOR_VALUE_TYPES = {"float32": pa.float32(), "float16": pa.float16()}
+
+# Distance used for vector search; ANN indexes must be built with the same one.
+# Cosine distance is 1 - cosine similarity, in [0, 2].
+DISTANCE_METRIC = "cosine"
+
+# Schema metadata marking tables whose vectors are stored unit-length. On those,
+# dot distance (1 - dot product) equals cosine distance without the norms.
+NORMALIZED_KEY = b"riffrag.normalized"
+
+# Vector dimensions per PQ sub-vector (each is coded as one byte)
+PQ_SUB_VECTOR_DIM = 16
+
+# Part of the lance error raised when a table's files were deleted under an open handle
+TABLE_NOT_FOUND = "Not found"
+
 
 class LanceDBStore:
     """LanceDB vector database operations."""
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ):
         """Initialize LanceDB store.
 
         Args:
             db_path: Path to LanceDB storage directory (default from settings)
+            nprobes: ANN index partitions searched per query (default from settings)
+            refine_factor: Re-rank factor for ANN candidates, 0 = off (default from settings)
         """
+        settings = get_settings()
         self.db_path = db_path or settings.database_dir
-        self.db = lancedb.connect(str(self.db_path))
+        self.nprobes = nprobes if nprobes is not None else settings.ann_nprobes
+        self.refine_factor = (
+            refine_factor if refine_factor is not None else settings.ann_refine_factor
+        )
+        self.db = lancedb.connect(
+            str(self.db_path), read_consistency_interval=READ_CONSISTENCY_INTERVAL
+        )
+        # Open tables and known table names, so each call doesn't list the
+        # database directory and reopen the dataset
+        self._table_cache: dict[str, Any] = {}
+        self._names_cache: Optional[set[str]] = None
         logger.info(f"Connected to LanceDB at {self.db_path}")
 
+    def _table_names(self, refresh: bool = False) -> set[str]:
+        """Names of the tables in the database, listed once and then cached.
+
+        Args:
+            refresh: List the database directory again
+
+        Returns:
+            Set of table names
+        """
+        if refresh or self._names_cache is None:
+            self._names_cache = set(self.db.table_names())
+        return self._names_cache
+
+    def _has_table(self, table_name: str) -> bool:
+        """Check if a table exists, re-listing on a miss (another process may have created it).
+
+        A cached name is confirmed against the table's directory, which
+        ``just delete`` / ``just update`` remove directly.
+        """
+        if table_name in self._table_names():
+            if (self.db_path / f"{table_name}.lance").exists():
+                return True
+            self._forget_table(table_name)
+            return table_name in self._table_names()
+        return table_name in self._table_names(refresh=True)
+
+    def _table(self, table_name: str):
+        """Open a table, reusing the handle from earlier calls."""
+        table = self._table_cache.get(table_name)
+        if table is None:
+            table = self._table_cache[table_name] = self.db.open_table(table_name)
+        return table
+
+    def _forget_table(self, table_name: str) -> None:
+        """Drop a table's cached handle and list the database directory again."""
+        self._table_cache.pop(table_name, None)
+        self._table_names(refresh=True)
+
+    def _run_on_table(self, table_name: str, operation: Callable[[Any], Any]) -> Any:
+        """Run an operation on a table, noticing when its files were deleted.
+
+        A table deleted or rebuilt on disk by another process leaves the cached
+        handle pointing at missing files, and lance reports "Not found". The
+        handle is then dropped and the table reopened if it exists again.
+
+        Args:
+            table_name: Name of the table
+            operation: Called with the open table
+
+        Returns:
+            The operation's result, or None if the table doesn't exist
+        """
+        for _ in range(2):
+            if not self._has_table(table_name):
+                return None
+            try:
+                return operation(self._table(table_name))
+            except RuntimeError as e:
+                if TABLE_NOT_FOUND not in str(e):
+                    raise
+                logger.debug("Table '%s' changed on disk, reopening: %s", table_name, e)
+                self._forget_table(table_name)
+        return None
+
     @staticmethod
+    @lru_cache(maxsize=128)
     def sanitize_name(name: str) -> str:
         """Sanitize database name to be filesystem-safe.
 
+        Cached, as every store call maps the same few codebase names.
+
         Args:
             name: Raw name
 
@@ -39,9 +173,9 @@ class LanceDBStore:
             Sanitized name safe for filesystem
         """
         # Replace spaces and special chars with underscores
-        sanitized = re.sub(r"[^\w\-]", "_", name.lower())
+        sanitized = UNSAFE_NAME_CHARS.sub("_", name.lower())
         # Remove multiple underscores
-        sanitized = re.sub(r"_+", "_", sanitized)
+        sanitized = REPEATED_UNDERSCORES.sub("_", sanitized)
         # Remove leading/trailing underscores
         sanitized = sanitized.strip("_")
         return sanitized
@@ -57,6 +191,18 @@ class LanceDBStore:
         """
         return f"{self.sanitize_name(codebase_name)}_rag"
 
+    @staticmethod
+    def _distance_type(table) -> str:
+        """Distance to search a table with: dot if its vectors are unit-length."""
+        metadata = table.schema.metadata or {}
+        return "dot" if metadata.get(NORMALIZED_KEY) == b"true" else DISTANCE_METRIC
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Scale vectors (rows) to unit length, leaving zero vectors as they are."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
     @staticmethod
     def _generate_id(codebase_name: str, file_path: str) -> str:
         """Generate unique ID for a chunk.
@@ -81,11 +227,13 @@ class LanceDBStore:
         Returns:
             Table name created
         """
+        settings = get_settings()
         table_name = self._get_table_name(codebase_name)
         dim = embedding_dim or settings.embedding_dimension
+        value_type = VECTOR_VALUE_TYPES[settings.vector_dtype]
 
         # Check if table already exists
-        if table_name in self.db.table_names():
+        if self._has_table(table_name):
             logger.info(f"Table '{table_name}' already exists")
             return table_name
 
@@ -105,22 +253,32 @@ class LanceDBStore:
                 pa.field("end_line", pa.int32()),
                 pa.field("chunk_index", pa.int32()),
                 pa.field("total_chunks", pa.int32()),
-                pa.field("vector", pa.list_(pa.float32(), dim)),
-            ]
+                pa.field("vector", pa.list_(value_type, dim)),
+            ],
+            metadata={NORMALIZED_KEY: b"true"},
         )
 
         # Create empty table
-        self.db.create_table(table_name, schema=schema)
-        logger.info(f"Created table '{table_name}' with dimension {dim}")
+        self._table_cache[table_name] = self.db.create_table(table_name, schema=schema)
+        self._table_names().add(table_name)
+        logger.info(f"Created table '{table_name}' with dimension {dim} ({settings.vector_dtype})")
 
         return table_name
 
-    def insert_chunks(self, codebase_name: str, chunks: list[dict[str, Any]]) -> int:
+    def insert_chunks(
+        self,
+        codebase_name: str,
+        chunks: list[dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> int:
         """Insert chunks into the database.
 
         Args:
             codebase_name: Name of the codebase
-            chunks: List of chunk dictionaries with 'embedding' field
+            chunks: List of chunk dictionaries (with an 'embedding' field unless
+                embeddings is given)
+            embeddings: Optional (len(chunks), dimension) matrix of embeddings,
+                one row per chunk; handed to Arrow without per-row conversion
 
         Returns:
             Number of chunks inserted
@@ -132,41 +290,62 @@ class LanceDBStore:
         table_name = self._get_table_name(codebase_name)
 
         # Ensure table exists
-        if table_name not in self.db.table_names():
+        if not self._has_table(table_name):
             self.create_table(codebase_name)
 
-        table = self.db.open_table(table_name)
-
-        # Prepare data for insertion
-        data = []
-        for chunk in chunks:
-            # Generate ID if not present
-            chunk_id = chunk.get("id") or self._generate_id(codebase_name, chunk["file_path"])
-
-            data.append(
-                {
-                    "id": chunk_id,
-                    "codebase_name": codebase_name,
-                    "file_path": chunk["file_path"],
-                    "absolute_path": chunk.get("absolute_path", ""),
-                    "content": chunk.get("content", ""),
-                    "extension": chunk.get("extension", ""),
-                    "size_bytes": chunk.get("size_bytes", 0),
-                    "modified_at": chunk.get("modified_at", datetime.now().isoformat()),
-                    "language": chunk.get("language", ""),
-                    "start_line": chunk.get("start_line", 1),
-                    "end_line": chunk.get("end_line", 1),
-                    "chunk_index": chunk.get("chunk_index", 0),
-                    "total_chunks": chunk.get("total_chunks", 1),
-                    "vector": chunk["embedding"],
-                }
-            )
+        table = self._table(table_name)
+
+        if embeddings is None:
+            embeddings = np.asarray([chunk["embedding"] for chunk in chunks], dtype=np.float32)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if self._distance_type(table) == "dot":
+            embeddings = self._normalize(embeddings)
+
+        # IDs derive from the file path, so chunks of one file share a single hash
+        file_ids = {
+            file_path: self._generate_id(codebase_name, file_path)
+            for file_path in dict.fromkeys(chunk["file_path"] for chunk in chunks)
+        }
+
+        # One list per column rather than a dict per row
+        now = datetime.now().isoformat()
+        columns = {
+            "id": [chunk.get("id") or file_ids[chunk["file_path"]] for chunk in chunks],
+            "codebase_name": [codebase_name] * len(chunks),
+            "file_path": [chunk["file_path"] for chunk in chunks],
+            "absolute_path": [chunk.get("absolute_path", "") for chunk in chunks],
+            "content": [chunk.get("content", "") for chunk in chunks],
+            "extension": [chunk.get("extension", "") for chunk in chunks],
+            "size_bytes": [chunk.get("size_bytes", 0) for chunk in chunks],
+            "modified_at": [chunk.get("modified_at", now) for chunk in chunks],
+            "language": [chunk.get("language", "") for chunk in chunks],
+            "start_line": [chunk.get("start_line", 1) for chunk in chunks],
+            "end_line": [chunk.get("end_line", 1) for chunk in chunks],
+            "chunk_index": [chunk.get("chunk_index", 0) for chunk in chunks],
+            "total_chunks": [chunk.get("total_chunks", 1) for chunk in chunks],
+        }
+
+        # The vector column is built straight from the matrix buffer
+        schema = table.schema
+        arrays = []
+        for field in schema:
+            if field.name == "vector":
+                # Converted in NumPy to the table's precision (float16 tables halve the copy)
+                values = embeddings.astype(field.type.value_type.to_pandas_dtype(), copy=False)
+                arrays.append(
+                    pa.FixedSizeListArray.from_arrays(
+                        pa.array(values.reshape(-1)), embeddings.shape[1]
+                    ).cast(field.type)
+                )
+            else:
+                arrays.append(pa.array(columns[field.name], type=field.type))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
 
         # Insert data
-        table.add(data)
-        logger.info(f"Inserted {len(data)} chunks into '{table_name}'")
+        table.add(batch)
+        logger.info(f"Inserted {batch.num_rows} chunks into '{table_name}'")
 
-        return len(data)
+        return batch.num_rows
 
     def search(
         self,
@@ -174,62 +353,203 @@ class LanceDBStore:
         query_embedding: list[float],
         limit: int = None,
         filters: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        columns: Optional[list[str]] = None,
     ) -> list[dict[str, Any]]:
         """Search for similar chunks.
 
+        Filters and the distance bound are applied by LanceDB, so rows that
+        don't qualify are never materialized and ``limit`` counts kept rows.
+
         Args:
             codebase_name: Name of the codebase
             query_embedding: Query embedding vector
             limit: Maximum number of results
             filters: Optional SQL-like filter string
+            max_distance: Optional maximum cosine distance (1 - min similarity)
+            columns: Columns to return (default SEARCH_COLUMNS); leaving out
+                ``content`` makes metadata-only searches much cheaper
 
         Returns:
             List of matching chunks with similarity scores
         """
-        table_name = self._get_table_name(codebase_name)
-        limit = limit or settings.default_search_limit
+        return list(
+            self.search_iter(codebase_name, query_embedding, limit, filters, max_distance, columns)
+        )
 
-        if table_name not in self.db.table_names():
-            logger.error(f"Table '{table_name}' does not exist")
-            return []
+    def search_iter(
+        self,
+        codebase_name: str,
+        query_embedding: list[float],
+        limit: int = None,
+        filters: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        columns: Optional[list[str]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Search for similar chunks, yielding them as LanceDB produces them.
 
-        table = self.db.open_table(table_name)
+        Only one record batch of results is converted to dicts at a time, so
+        a consumer that stops early doesn't pay for the rest.
 
-        # Perform vector search
-        search_query = table.search(query_embedding).limit(limit)
+        Args:
+            codebase_name: Name of the codebase
+            query_embedding: Query embedding vector
+            limit: Maximum number of results
+            filters: Optional SQL-like filter string
+            max_distance: Optional maximum cosine distance (1 - min similarity)
+            columns: Columns to return (default SEARCH_COLUMNS)
+            batch_size: Rows per record batch (default chosen by LanceDB)
+
+        Yields:
+            Matching chunks with similarity scores, most similar first
+        """
+        table_name = self._get_table_name(codebase_name)
+        limit = limit if limit is not None else get_settings().default_search_limit
+        if limit <= 0:
+            return
+
+        batches = self._run_on_table(
+            table_name,
+            lambda table: self._search_batches(
+                table, query_embedding, limit, filters, max_distance, columns, batch_size
+            ),
+        )
+        if batches is None:
+            logger.error(f"Table '{table_name}' does not exist")
+            return
+
+        for batch in batches:
+            # Cosine similarity for all rows in one vectorized step (1 - distance for
+            # both metrics; clipped, as float32 rounding can put an exact match a
+            # hair above 1)
+            distances = batch.column("_distance").to_numpy()
+            similarities = np.clip(1.0 - distances, -1.0, 1.0)
+
+            rows = batch.drop_columns(["_distance"]).to_pylist()
+            for row, similarity, distance in zip(rows, similarities.tolist(), distances.tolist()):
+                row["similarity"] = similarity
+                row["distance"] = distance
+                yield row
+
+    def _search_batches(
+        self,
+        table,
+        query_embedding: list[float],
+        limit: int,
+        filters: Optional[str],
+        max_distance: Optional[float],
+        columns: Optional[list[str]],
+        batch_size: Optional[int],
+    ) -> pa.RecordBatchReader:
+        """Run a vector search on an open table (see search_iter).
+
+        Returns:
+            Reader over the result batches, with a _distance column
+        """
+        distance_type = self._distance_type(table)
+        if distance_type == "dot":
+            query_embedding = self._normalize(np.asarray(query_embedding, dtype=np.float32))
+
+        # Perform vector search (nprobes/refine_factor only matter once an ANN index exists)
+        search_query = (
+            table.search(query_embedding)
+            .distance_type(distance_type)
+            .nprobes(self.nprobes)
+            .select([*(columns or SEARCH_COLUMNS), "_distance"])
+            .limit(limit)
+        )
+        if self.refine_factor:
+            search_query = search_query.refine_factor(self.refine_factor)
 
         if filters:
             search_query = search_query.where(filters)
+        if max_distance is not None:
+            # The upper bound is exclusive; nudge it so a row exactly at it is kept
+            search_query = search_query.distance_range(
+                upper_bound=float(np.nextafter(np.float32(max_distance), np.float32(np.inf)))
+            )
+
+        return search_query.to_batches(batch_size)
+
+    def create_vector_index(
+        self,
+        codebase_name: str,
+        metric: Optional[str] = None,
+        index_type: str = "IVF_PQ",
+        num_partitions: Optional[int] = None,
+        num_sub_vectors: Optional[int] = None,
+    ) -> bool:
+        """Build (or rebuild) an ANN index on a codebase's vector column.
+
+        Searches then probe ``nprobes`` partitions of compressed PQ codes
+        instead of scanning every vector, and re-rank ``refine_factor`` times
+        the limit by exact distance. Rows added after the index is built are
+        still found, by brute force, until it is rebuilt.
 
-        results = search_query.to_list()
-
-        # Convert results to dictionaries
-        output = []
-        for result in results:
-            # LanceDB returns distance, convert to similarity score
-            distance = result.get("_distance", 0)
-            similarity = 1 / (1 + distance)  # Convert distance to similarity
-
-            output.append(
-                {
-                    "id": result["id"],
-                    "file_path": result["file_path"],
-                    "absolute_path": result.get("absolute_path", ""),
-                    "content": result["content"],
-                    "extension": result["extension"],
-                    "size_bytes": result["size_bytes"],
-                    "modified_at": result.get("modified_at", ""),
-                    "language": result.get("language", ""),
-                    "start_line": result.get("start_line", 1),
-                    "end_line": result.get("end_line", 1),
-                    "chunk_index": result.get("chunk_index", 0),
-                    "total_chunks": result.get("total_chunks", 1),
-                    "similarity": similarity,
-                    "distance": distance,
-                }
+        Args:
+            codebase_name: Name of the codebase
+            metric: Distance metric (default: the one searches of this table use)
+            index_type: LanceDB index type (e.g. "IVF_PQ", "IVF_HNSW_SQ")
+            num_partitions: Number of IVF partitions (default: sqrt of the row count)
+            num_sub_vectors: Number of PQ sub-vectors, must divide the dimension
+                (default: one per 16 dimensions)
+
+        Returns:
+            True if the index was built, False otherwise
+        """
+        table_name = self._get_table_name(codebase_name)
+
+        if not self._has_table(table_name):
+            logger.warning(f"Table '{table_name}' does not exist")
+            return False
+
+        table = self._table(table_name)
+        if num_partitions is None:
+            num_partitions = max(1, int(np.sqrt(table.count_rows())))
+        if num_sub_vectors is None:
+            num_sub_vectors = self._num_sub_vectors(table.schema.field("vector").type.list_size)
+
+        try:
+            table.create_index(
+                metric=metric or self._distance_type(table),
+                vector_column_name="vector",
+                index_type=index_type,
+                num_partitions=num_partitions,
+                num_sub_vectors=num_sub_vectors,
+                replace=True,
             )
+        except Exception as e:
+            logger.warning(f"Could not build vector index on '{table_name}': {e}")
+            return False
 
-        return output
+        logger.info(
+            f"Built {index_type} vector index on '{table_name}' "
+            f"({num_partitions} partitions, {num_sub_vectors} sub-vectors)"
+        )
+        return True
+
+    @staticmethod
+    def _num_sub_vectors(dimension: int) -> int:
+        """Largest PQ sub-vector count dividing the dimension, at most one per 16 dims."""
+        for count in range(max(1, dimension // PQ_SUB_VECTOR_DIM), 1, -1):
+            if dimension % count == 0:
+                return count
+        return 1
+
+    def ensure_vector_index(self, codebase_name: str) -> bool:
+        """Build an ANN index if the table has grown past ``ann_index_min_rows``.
+
+        Args:
+            codebase_name: Name of the codebase
+
+        Returns:
+            True if an index was built, False if the table is too small or it failed
+        """
+        min_rows = get_settings().ann_index_min_rows
+        if not min_rows or self.count_rows(codebase_name) < min_rows:
+            return False
+        return self.create_vector_index(codebase_name)
 
     def delete_table(self, codebase_name: str) -> bool:
         """Delete a codebase table.
@@ -242,11 +562,13 @@ class LanceDBStore:
         """
         table_name = self._get_table_name(codebase_name)
 
-        if table_name not in self.db.table_names():
+        if not self._has_table(table_name):
             logger.warning(f"Table '{table_name}' does not exist")
             return False
 
         self.db.drop_table(table_name)
+        self._table_cache.pop(table_name, None)
+        self._table_names().discard(table_name)
         logger.info(f"Deleted table '{table_name}'")
         return True
 
@@ -256,7 +578,7 @@ class LanceDBStore:
         Returns:
             List of codebase names (without _rag suffix)
         """
-        tables = self.db.table_names()
+        tables = sorted(self._table_names(refresh=True))
         # Remove _rag suffix to get codebase names
         codebases = [t.replace("_rag", "") for t in tables if t.endswith("_rag")]
         return codebases
@@ -272,16 +594,55 @@ class LanceDBStore:
         """
         table_name = self._get_table_name(codebase_name)
 
-        if table_name not in self.db.table_names():
+        stats = self._compute_stats(codebase_name, table_name)
+        if stats is None:
             logger.warning(f"Table '{table_name}' does not exist")
-            return None
+        return stats
+
+    def list_tables_with_stats(self) -> list[dict[str, Any]]:
+        """List all codebase tables together with their statistics.
 
-        table = self.db.open_table(table_name)
+        Tables are listed once and their stats are computed concurrently,
+        since opening and scanning each table is mostly I/O.
+
+        Returns:
+            List of statistics dictionaries (see get_stats), one per codebase
+        """
+        table_names = [t for t in sorted(self._table_names(refresh=True)) if t.endswith("_rag")]
+        if not table_names:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(STATS_MAX_WORKERS, len(table_names))) as executor:
+            all_stats = executor.map(
+                lambda t: self._compute_stats(t.replace("_rag", ""), t), table_names
+            )
+            # A table deleted while listing has no stats
+            return [stats for stats in all_stats if stats is not None]
+
+    def _compute_stats(self, codebase_name: str, table_name: str) -> Optional[dict[str, Any]]:
+        """Compute statistics for a table.
+
+        Args:
+            codebase_name: Name of the codebase
+            table_name: Name of the codebase's table
+
+        Returns:
+            Dictionary with statistics, or None if the table doesn't exist
+        """
+        return self._run_on_table(
+            table_name, lambda table: self._table_stats(codebase_name, table_name, table)
+        )
+
+    @staticmethod
+    def _table_stats(codebase_name: str, table_name: str, table) -> dict[str, Any]:
+        """Compute statistics for an open table (see _compute_stats)."""
         count = table.count_rows()
 
-        # Get file extension distribution
-        df = table.to_pandas()
-        extension_counts = df["extension"].value_counts().to_dict()
+        # Get file extension distribution, reading only that column (most common first)
+        extensions = table.search().select(["extension"]).limit(count).to_arrow()
+        value_counts = pc.value_counts(extensions.column("extension")).to_pylist()
+        value_counts.sort(key=lambda item: item["counts"], reverse=True)
+        extension_counts = {item["values"]: item["counts"] for item in value_counts}
 
         return {
             "codebase_name": codebase_name,
@@ -290,6 +651,46 @@ class LanceDBStore:
             "extension_distribution": extension_counts,
         }
 
+    def count_rows(self, codebase_name: str) -> int:
+        """Count the chunks stored for a codebase.
+
+        Args:
+            codebase_name: Name of the codebase
+
+        Returns:
+            Number of rows, or 0 if the table doesn't exist
+        """
+        table_name = self._get_table_name(codebase_name)
+
+        return self._run_on_table(table_name, lambda table: table.count_rows()) or 0
+
+    def table_version(self, codebase_name: str) -> Optional[str]:
+        """Identify the current version of a codebase's table.
+
+        Every write (insert, delete, index build) creates a new LanceDB version.
+        Version numbers start over when a table is deleted and re-created (``just
+        update``), so the number is paired with the modification time of the
+        table's version directory, which a re-created table doesn't share.
+
+        Args:
+            codebase_name: Name of the codebase
+
+        Returns:
+            Identifier that changes whenever the table's contents may have
+            changed, or None if the table doesn't exist
+        """
+        table_name = self._get_table_name(codebase_name)
+        versions_dir = self.db_path / f"{table_name}.lance" / "_versions"
+
+        def version(table) -> Optional[str]:
+            try:
+                modified_ns = versions_dir.stat().st_mtime_ns
+            except OSError:
+                return None
+            return f"{table.version}:{modified_ns}"
+
+        return self._run_on_table(table_name, version)
+
     def table_exists(self, codebase_name: str) -> bool:
         """Check if table exists for codebase.
 
@@ -300,4 +701,4 @@ class LanceDBStore:
             True if table exists, False otherwise
         """
         table_name = self._get_table_name(codebase_name)
-        return table_name in self.db.table_names()
+        return self._has_table(table_name)
@@ -0,0 +1,47 @@
+"""Console output helpers shared by the CLI scripts."""
+
+import sys
+from typing import Any, Optional
+
+from rich.console import Console
+from rich.panel import Panel
+
+# Row templates, built once rather than per banner
+ROW_MARKUP = "[yellow]{label}:[/yellow] {value}"
+ROW_PLAIN = "{label}: {value}"
+
+
+def print_banner(
+    console: Console,
+    title: str,
+    rows: list[tuple[Optional[str], Any]],
+    style: str = "cyan",
+) -> None:
+    """Print a titled banner of label/value rows.
+
+    On a terminal this renders a Rich panel. When output is piped or captured,
+    plain text is written directly so Rich's markup parsing and box drawing
+    are skipped.
+
+    Args:
+        console: Rich console to print to
+        title: Banner title
+        rows: (label, value) pairs; a None label prints the value on its own
+        style: Rich color used for the title and border
+    """
+    if console.is_terminal:
+        body = "\n".join(
+            str(value) if label is None else ROW_MARKUP.format(label=label, value=value)
+            for label, value in rows
+        )
+        console.print(
+            Panel.fit(f"[bold {style}]{title}[/bold {style}]\n\n{body}", border_style=style)
+        )
+        return
+
+    lines = [title, ""]
+    lines.extend(
+        str(value) if label is None else ROW_PLAIN.format(label=label, value=value)
+        for label, value in rows
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
@@ -0,0 +1,101 @@
+"""Gitignore-style pattern lists compiled into a single regular expression."""
+
+import re
+import threading
+from collections.abc import Iterable
+
+from pathspec.patterns import GitWildMatchPattern
+
+try:
+    import hyperscan
+except ImportError:  # optional: hyperscan matches all patterns in one DFA pass
+    hyperscan = None
+
+# pathspec marks directory matches with a named group, which may only appear once per regex
+DIR_GROUP = "(?P<ps_d>"
+
+
+class HyperscanMatcher:
+    """Hyperscan database of path regexes, with the ``match`` interface of ``re``."""
+
+    def __init__(self, regexes: list[str]):
+        """Compile regexes into a block-mode database.
+
+        Args:
+            regexes: Anchored regexes without lookarounds (Hyperscan has none)
+        """
+        self.database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        self.database.compile(
+            expressions=[regex.encode() for regex in regexes],
+            ids=list(range(len(regexes))),
+            elements=len(regexes),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8] * len(regexes),
+        )
+        # Scratch space can't be shared by concurrent scans, so each thread gets its own
+        self._local = threading.local()
+
+    def match(self, path: str) -> bool:
+        """Check whether any regex matches the path."""
+        matched = False
+
+        def on_match(pattern_id, start, end, flags, context):
+            nonlocal matched
+            matched = True
+            # Stop scanning at the first match
+            return True
+
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = hyperscan.Scratch(self.database)
+
+        self.database.scan(
+            path.encode("utf-8", "surrogateescape"),
+            match_event_handler=on_match,
+            scratch=scratch,
+        )
+        return matched
+
+
+def compile_gitwildmatch(patterns: Iterable[str]):
+    """Compile gitwildmatch patterns into one matcher with the same meaning.
+
+    Each pattern's regex comes from pathspec, with unanchored ones (such as
+    ``*/``) allowed to match anywhere in the path. As in .gitignore the last
+    matching pattern decides: positive patterns are alternated with what came
+    before, and a negation wraps everything before it in a negative lookahead,
+    ``(?!neg)(?:prev)``. One ``match`` call then replaces pathspec's loop over
+    every pattern. Without negations, and when it's installed, Hyperscan
+    matches the patterns instead of ``re``.
+
+    Args:
+        patterns: Gitignore-style patterns, in file order
+
+    Returns:
+        Compiled matcher whose ``match`` is truthy for excluded paths
+        (directories are checked with a trailing slash)
+    """
+    alternatives = []
+    negated = False
+    for pattern in patterns:
+        regex, include = GitWildMatchPattern.pattern_to_regex(pattern)
+        if regex is None:
+            continue
+        regex = regex.replace(DIR_GROUP, "(?:")
+        if not regex.startswith("^"):
+            # pathspec applies unanchored regexes (e.g. "*/") with search, not match
+            regex = f"^.*(?:{regex})"
+        if include:
+            alternatives.append(regex)
+        elif alternatives:
+            negated = True
+            # A negation only un-excludes paths matched by earlier patterns
+            alternatives = [f"(?!{regex})(?:{'|'.join(alternatives)})"]
+
+    if hyperscan is not None and alternatives and not negated:
+        try:
+            return HyperscanMatcher(alternatives)
+        except hyperscan.error:
+            pass
+
+    # An empty alternation would match everything; (?!) matches nothing
+    return re.compile("|".join(alternatives) if alternatives else "(?!)")
@@ -0,0 +1,155 @@
+"""Compiled matcher for file exclusion patterns."""
+
+import fnmatch
+import os
+import re
+from collections.abc import Iterable
+
+from src.utils.compiled_spec import compile_gitwildmatch
+
+try:
+    import re2
+except ImportError:  # optional: google-re2 matches the glob alternation in linear time
+    re2 = None
+
+# Characters that make a pattern a glob rather than a literal name
+GLOB_CHARS = frozenset("*?[")
+
+# Characters ending the literal prefix of a path pattern (globs and escapes)
+PREFIX_STOP_CHARS = re.compile(r"[*?\[\\]")
+
+
+def _compile_globs(globs: list[str]):
+    """Compile slash-free glob patterns into a single alternation regex.
+
+    Uses google-re2 when it's installed and can handle the translated
+    pattern (it has no atomic groups), falling back to the ``re`` module.
+
+    Args:
+        globs: Glob patterns to combine
+
+    Returns:
+        Compiled regex object with a ``match`` method
+    """
+    pattern = "|".join(fnmatch.translate(g) for g in globs)
+    if re2 is not None:
+        try:
+            # RE2 spells the end-of-text anchor \z rather than \Z
+            return re2.compile(pattern.replace(r"\Z", r"\z"))
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Leading literal part of a path pattern, or "" if it can match anywhere.
+
+    A pattern with a slash before its end is anchored to the root, so every
+    path it matches starts with its text up to the last slash before the
+    first glob character (or with the whole pattern, if it has none).
+
+    Args:
+        pattern: Gitignore-style pattern containing a slash
+
+    Returns:
+        Prefix every matching path starts with
+    """
+    body = pattern.rstrip("/")
+    if "/" not in body:
+        return ""
+    body = body.removeprefix("/")
+    stop = PREFIX_STOP_CHARS.search(body)
+    if stop is None:
+        return body
+    return body[: body.rfind("/", 0, stop.start()) + 1]
+
+
+class ExcludeMatcher:
+    """Match relative paths against exclusion patterns compiled once.
+
+    Patterns are partitioned by how cheaply they can be checked: literal names
+    become a set lookup, ``*.ext`` patterns a single ``str.endswith`` call, and the
+    remaining slash-free globs share a single regex (RE2 when available). Patterns containing a
+    slash keep full gitwildmatch semantics in a second combined regex. A negation can un-exclude
+    a path matched by any earlier pattern, so when there is one every pattern goes into that
+    regex, in order.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """Compile exclusion patterns.
+
+        Args:
+            patterns: Gitignore-style patterns to exclude
+        """
+        self.patterns = tuple(patterns)
+
+        names = set()
+        suffixes = []
+        globs = []
+        path_patterns = []
+
+        stripped = [p.strip() for p in self.patterns]
+        stripped = [p for p in stripped if p and not p.startswith("#")]
+        negated = any(p.startswith("!") for p in stripped)
+
+        for pattern in stripped:
+            if negated or "/" in pattern:
+                path_patterns.append(pattern)
+            elif not GLOB_CHARS.intersection(pattern):
+                names.add(pattern)
+            elif pattern.startswith("*.") and not GLOB_CHARS.intersection(pattern[1:]):
+                suffixes.append(pattern[1:])
+            else:
+                globs.append(pattern)
+
+        self.names = frozenset(names)
+        # Tuple so str.endswith can test all suffixes in one C-level call
+        self.suffixes = tuple(dict.fromkeys(suffixes))
+        self.glob_regex = _compile_globs(globs) if globs else None
+        self.path_regex = compile_gitwildmatch(path_patterns) if path_patterns else None
+        # Paths outside every positive pattern's literal prefix can't be excluded by
+        # path_regex (negations only ever un-exclude), so str.startswith rules them out
+        prefixes = [_literal_prefix(p) for p in path_patterns if not p.startswith("!")]
+        self.path_prefixes = tuple(dict.fromkeys(prefixes)) if all(prefixes) else None
+
+    def is_excluded(
+        self, rel_path: str, is_dir: bool = False, parent_included: bool = False
+    ) -> bool:
+        """Check if a path relative to the codebase root is excluded.
+
+        Slash-free patterns match any component of the path, as in .gitignore.
+
+        Args:
+            rel_path: Relative path to check
+            is_dir: Whether the path is a directory (enables dir-only patterns)
+            parent_included: The parent directory is known not to be excluded, so
+                slash-free patterns only need to be tested against the last component
+
+        Returns:
+            True if the path matches any pattern
+        """
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+
+        parts = [rel_path.rpartition("/")[2]] if parent_included else rel_path.split("/")
+
+        if self.names and not self.names.isdisjoint(parts):
+            return True
+
+        if self.suffixes:
+            for part in parts:
+                if part.endswith(self.suffixes):
+                    return True
+
+        if self.glob_regex is not None:
+            for part in parts:
+                if self.glob_regex.match(part):
+                    return True
+
+        if self.path_regex is not None:
+            if self.path_prefixes is not None and not rel_path.startswith(self.path_prefixes):
+                return False
+            if self.path_regex.match(rel_path + "/" if is_dir else rel_path):
+                return True
+
+        return False
@@ -1,177 +1,359 @@
 """File filtering utilities including gitignore support."""
 
 import logging
+import os
+import re
+from collections import Counter, deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
-import pathspec
-
-from config.settings import settings
+from config.settings import get_settings
+from src.utils.compiled_spec import compile_gitwildmatch
+from src.utils.exclude_matcher import ExcludeMatcher
 
 logger = logging.getLogger(__name__)
 
+# Threads listing directories ahead of the filtering in parallel walks
+WALK_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
 
 class FileFilter:
     """Filter files based on patterns and .gitignore."""
 
-    def __init__(self, codebase_root: Path, additional_patterns: Optional[list[str]] = None):
+    def __init__(
+        self,
+        codebase_root: Path,
+        additional_patterns: Optional[list[str]] = None,
+        exclude_matcher: Optional[ExcludeMatcher] = None,
+    ):
         """Initialize file filter.
 
         Args:
             codebase_root: Root directory of codebase
             additional_patterns: Additional patterns to exclude
+            exclude_matcher: Precompiled matcher for default and additional patterns
+                (built from settings when omitted)
         """
         self.codebase_root = Path(codebase_root)
         self.additional_patterns = additional_patterns or []
 
         # Load patterns
-        self.default_patterns = settings.default_exclude_patterns
-        self.gitignore_spec = self._load_gitignore()
-
-    def _load_gitignore(self) -> Optional[pathspec.PathSpec]:
-        """Load and parse .gitignore file.
+        if exclude_matcher is None:
+            exclude_matcher = get_settings().combined_exclude(self.additional_patterns)
 
-        Returns:
-            PathSpec object or None if .gitignore not found
-        """
         gitignore_path = self.codebase_root / ".gitignore"
-
-        if not gitignore_path.exists():
-            logger.debug(f"No .gitignore found at {gitignore_path}")
-            return None
-
         try:
-            with open(gitignore_path, encoding="utf-8") as f:
-                patterns = f.read().splitlines()
-
-            # Remove comments and empty lines
-            patterns = [p.strip() for p in patterns if p.strip() and not p.strip().startswith("#")]
-
-            spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
-            logger.info(f"Loaded {len(patterns)} patterns from .gitignore")
-            return spec
-
-        except Exception as e:
+            stat = os.stat(gitignore_path)
+        except FileNotFoundError:
+            logger.debug(f"No .gitignore found at {gitignore_path}")
+            stat = None
+        except OSError as e:
             logger.warning(f"Error loading .gitignore: {e}")
-            return None
-
-    def _matches_pattern(self, file_path: Path, patterns: list[str]) -> bool:
-        """Check if file matches any pattern.
+            stat = None
+
+        self.gitignore_regex = None
+        if stat is not None:
+            # Cached across filters; an edited .gitignore changes the key
+            merged_matcher, self.gitignore_regex = _compile_gitignore(
+                str(gitignore_path), stat.st_mtime_ns, stat.st_size, exclude_matcher.patterns
+            )
+            exclude_matcher = merged_matcher or exclude_matcher
+        self.exclude_matcher = exclude_matcher
+
+    def should_exclude(
+        self,
+        file_path: Union[Path, str],
+        rel_path: Optional[str] = None,
+        parent_included: bool = False,
+    ) -> bool:
+        """Check if file should be excluded.
 
         Args:
             file_path: Path to check
-            patterns: List of glob patterns
+            rel_path: Path relative to the codebase root, if the caller already has it
+            parent_included: The file's directory already passed should_exclude_dir
 
         Returns:
-            True if matches any pattern
+            True if file should be excluded
         """
-        try:
-            # Create PathSpec from patterns
-            spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
-
-            # Get relative path
+        if rel_path is None:
+            file_path = Path(file_path)
             try:
-                rel_path = file_path.relative_to(self.codebase_root)
+                # Get relative path for checking
+                rel_path = file_path.relative_to(self.codebase_root).as_posix()
             except ValueError:
-                rel_path = file_path
+                rel_path = file_path.as_posix()
 
-            return spec.match_file(str(rel_path))
+        # Check gitignore
+        if self.gitignore_regex and self.gitignore_regex.match(rel_path):
+            logger.debug("Excluded by .gitignore: %s", rel_path)
+            return True
 
-        except Exception as e:
-            logger.debug(f"Error matching pattern for {file_path}: {e}")
-            return False
+        # Check default, additional and (when merged) .gitignore patterns
+        if self.exclude_matcher.is_excluded(rel_path, parent_included=parent_included):
+            logger.debug("Excluded by exclude patterns: %s", rel_path)
+            return True
 
-    def should_exclude(self, file_path: Path) -> bool:
-        """Check if file should be excluded.
+        return False
+
+    def should_exclude_dir(self, rel_dir: str, parent_included: bool = False) -> bool:
+        """Check if a whole directory should be pruned from the walk.
 
         Args:
-            file_path: Path to check
+            rel_dir: Directory path relative to the codebase root
+            parent_included: The parent directory already passed should_exclude_dir
 
         Returns:
-            True if file should be excluded
+            True if the directory and everything below it should be skipped
         """
-        try:
-            # Get relative path for checking
-            rel_path = file_path.relative_to(self.codebase_root)
-        except ValueError:
-            rel_path = file_path
-
-        rel_path_str = str(rel_path)
-
-        # Check gitignore
-        if self.gitignore_spec and self.gitignore_spec.match_file(rel_path_str):
-            logger.debug(f"Excluded by .gitignore: {rel_path}")
+        if self.gitignore_regex and self.gitignore_regex.match(rel_dir + "/"):
+            logger.debug("Pruned by .gitignore: %s", rel_dir)
             return True
 
-        # Check default patterns
-        if self._matches_pattern(file_path, self.default_patterns):
-            logger.debug(f"Excluded by default patterns: {rel_path}")
-            return True
-
-        # Check additional patterns
-        if self.additional_patterns and self._matches_pattern(file_path, self.additional_patterns):
-            logger.debug(f"Excluded by additional patterns: {rel_path}")
+        if self.exclude_matcher.is_excluded(rel_dir, is_dir=True, parent_included=parent_included):
+            logger.debug("Pruned by exclude patterns: %s", rel_dir)
             return True
 
         return False
 
-    def walk_files(self, show_progress: bool = False) -> list[Path]:
+    def walk_files(
+        self, show_progress: bool = False, parallel: bool = True, as_path: bool = True
+    ) -> list[Union[Path, str]]:
         """Walk directory and return filtered file paths.
 
         Args:
             show_progress: Whether to show progress
+            parallel: List directories on a thread pool ahead of the filtering
+            as_path: Return Path objects (False returns the path strings)
 
         Returns:
             List of file paths to process
         """
-        files = []
+        files = list(
+            self.iter_files(show_progress=show_progress, parallel=parallel, as_path=as_path)
+        )
+        logger.info(f"Found {len(files)} files to process (after filtering)")
+        return files
+
+    def iter_files(
+        self, show_progress: bool = False, parallel: bool = True, as_path: bool = True
+    ) -> Iterator[Union[Path, str]]:
+        """Walk directory and yield filtered file paths as they are found.
+
+        In parallel mode directories are listed and filtered by worker threads
+        ahead of the consumer (scandir, and Hyperscan matching, release the
+        GIL), at most WALK_MAX_WORKERS at a time, and are visited breadth-first
+        instead of depth-first.
+
+        Args:
+            show_progress: Whether to show progress
+            parallel: Scan directories on a thread pool ahead of the consumer
+            as_path: Yield Path objects (False yields the path strings)
 
+        Yields:
+            File paths to process
+        """
         if show_progress:
             logger.info(f"Scanning {self.codebase_root}...")
 
-        for path in self.codebase_root.rglob("*"):
-            # Skip directories
-            if not path.is_file():
+        executor = (
+            ThreadPoolExecutor(max_workers=WALK_MAX_WORKERS, thread_name_prefix="walk")
+            if parallel
+            else None
+        )
+        # Directories still to scan, as (absolute path, path relative to the root with
+        # a trailing slash)
+        unscanned = deque([(str(self.codebase_root), "")])
+        # Parallel mode: (absolute path, scan future) submitted ahead of the consumer.
+        # Capped so listings can't pile up in memory faster than files are consumed.
+        scans = deque()
+        try:
+            while unscanned or scans:
+                if executor:
+                    while unscanned and len(scans) < WALK_MAX_WORKERS:
+                        dirpath, prefix = unscanned.popleft()
+                        scans.append(
+                            (dirpath, executor.submit(self._scan_dir, dirpath, prefix, as_path))
+                        )
+                    # Scans are consumed in the order they were submitted
+                    dirpath, scan = scans.popleft()
+                else:
+                    dirpath, prefix = unscanned.pop()
+
+                try:
+                    files, subdirs = (
+                        scan.result() if executor else self._scan_dir(dirpath, prefix, as_path)
+                    )
+                except OSError as e:
+                    logger.warning(f"Could not scan {dirpath}: {e}")
+                    continue
+
+                yield from files
+
+                if executor:
+                    unscanned.extend(subdirs)
+                else:
+                    # Reversed so directories are visited in listing order, like os.walk
+                    unscanned.extend(reversed(subdirs))
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scan_dir(
+        self, dirpath: str, prefix: str, as_path: bool
+    ) -> tuple[list[Union[Path, str]], list[tuple[str, str]]]:
+        """List one directory and filter its entries.
+
+        Runs on the walk's worker threads in parallel mode: the matchers are only
+        read (Hyperscan keeps its scratch space per thread).
+
+        Args:
+            dirpath: Absolute path of the directory
+            prefix: Its path relative to the root, with a trailing slash ("" for the root)
+            as_path: Return Path objects (False returns the path strings)
+
+        Returns:
+            (files to process, [(subdirectory, its relative prefix)] to descend into)
+        """
+        names = self.exclude_matcher.names
+        suffixes = self.exclude_matcher.suffixes
+
+        files = []
+        subdirs = []
+        # Built on the first file kept; joining a name onto it is about twice as
+        # fast as parsing each full path into a Path
+        dir_path = None
+        for entry in _list_dir(dirpath):
+            name = entry.name
+            # Excluded names (.git, node_modules, ...) go before any path is built
+            if name in names:
+                continue
+
+            # Relative paths are built from the directory's prefix, without a Path
+            rel_path = prefix + name
+
+            # DirEntry answers from the directory listing, without a stat per entry
+            if entry.is_dir(follow_symlinks=False):
+                # Prune excluded directories so the walk never descends into them.
+                # Anything below is only reached through included directories,
+                # so only each entry's own name needs the per-component checks.
+                if not self.should_exclude_dir(rel_path, parent_included=True):
+                    subdirs.append((entry.path, rel_path + "/"))
                 continue
 
-            # Check if should exclude
-            if self.should_exclude(path):
+            # Cheap suffix check before touching the disk
+            if suffixes and name.endswith(suffixes):
                 continue
 
-            files.append(path)
+            # Skip special files and broken symlinks (only symlinks need a stat here)
+            if not entry.is_file():
+                continue
+
+            # Check if should exclude (strings only; a Path is built just for output)
+            if self.should_exclude(entry.path, rel_path, parent_included=True):
+                continue
+
+            if not as_path:
+                files.append(entry.path)
+                continue
+            if dir_path is None:
+                dir_path = Path(dirpath)
+            files.append(dir_path / name)
+
+        return files, subdirs
 
-        logger.info(f"Found {len(files)} files to process (after filtering)")
-        return files
+
+def _load_gitignore(gitignore_path: str) -> list[str]:
+    """Load the patterns from a .gitignore file.
+
+    Comments and blank lines are kept; the matchers skip them.
+
+    Args:
+        gitignore_path: Path of the .gitignore file
+
+    Returns:
+        Stripped lines of the .gitignore (empty if it can't be read)
+    """
+    try:
+        with open(gitignore_path, encoding="utf-8") as f:
+            # Stripped as before: only pathspec would treat leading spaces as significant
+            patterns = [line.strip() for line in f]
+
+        logger.info(f"Loaded {len(patterns)} lines from .gitignore")
+        return patterns
+
+    except Exception as e:
+        logger.warning(f"Error loading .gitignore: {e}")
+        return []
+
+
+@lru_cache(maxsize=32)
+def _compile_gitignore(
+    gitignore_path: str, mtime_ns: int, size: int, exclude_patterns: tuple[str, ...]
+) -> tuple[Optional[ExcludeMatcher], Optional[re.Pattern]]:
+    """Compile a .gitignore together with the exclude patterns, once per version.
+
+    Args:
+        gitignore_path: Path of the .gitignore file
+        mtime_ns: Modification time of the file (part of the cache key)
+        size: Size of the file (part of the cache key)
+        exclude_patterns: Default and additional exclude patterns
+
+    Returns:
+        (matcher covering both pattern sets, None), or (None, .gitignore regex)
+        when negations keep the .gitignore separate, or (None, None) if it's empty
+    """
+    gitignore_patterns = _load_gitignore(gitignore_path)
+    if any(p.startswith("!") for p in gitignore_patterns):
+        # Negations may only re-include what .gitignore itself excluded, so keep it separate
+        return None, compile_gitwildmatch(gitignore_patterns)
+    if gitignore_patterns:
+        # One matcher for everything: a single is_excluded call decides each path
+        return ExcludeMatcher((*exclude_patterns, *gitignore_patterns)), None
+    return None, None
+
+
+def _list_dir(dirpath: str) -> list[os.DirEntry]:
+    """List a directory's entries (file types come from the listing itself)."""
+    with os.scandir(dirpath) as it:
+        return list(it)
 
 
 def get_all_files(
-    codebase_path: Path, additional_exclude: Optional[list[str]] = None
-) -> list[Path]:
+    codebase_path: Path,
+    additional_exclude: Optional[list[str]] = None,
+    exclude_matcher: Optional[ExcludeMatcher] = None,
+    stream: bool = False,
+    as_path: bool = True,
+) -> Union[list[Path], Iterator[Path], list[str], Iterator[str]]:
     """Get all files from codebase with filtering.
 
     Args:
         codebase_path: Path to codebase
         additional_exclude: Additional patterns to exclude
+        exclude_matcher: Precompiled matcher for default and additional patterns
+        stream: Return an iterator yielding files as the walk finds them
+        as_path: Return Path objects (False returns the path strings)
 
     Returns:
-        List of file paths
+        List of file paths, or an iterator over them when streaming
     """
-    file_filter = FileFilter(codebase_path, additional_exclude)
-    return file_filter.walk_files()
+    file_filter = FileFilter(codebase_path, additional_exclude, exclude_matcher)
+    if stream:
+        return file_filter.iter_files(as_path=as_path)
+    return file_filter.walk_files(as_path=as_path)
 
 
 def count_files_by_extension(files: list[Path]) -> dict:
     """Count files by extension.
 
     Args:
-        files: List of file paths
+        files: List of file paths (Path or str)
 
     Returns:
         Dictionary of extension -> count
     """
-    counts = {}
-    for file in files:
-        ext = file.suffix or "no_extension"
-        counts[ext] = counts.get(ext, 0) + 1
-
-    return counts
+    return dict(Counter(os.path.splitext(file)[1] or "no_extension" for file in files))
@@ -0,0 +1,58 @@
+"""Regression tests for compile_gitwildmatch against pathspec's own matching."""
+
+import warnings
+
+from pathspec import PathSpec
+
+from src.utils.compiled_spec import compile_gitwildmatch
+
+PATHS = [
+    "top.py",
+    "top.txt",
+    "d/",
+    "d/x.py",
+    "d/x.txt",
+    "d/e/",
+    "d/e/y.py",
+    "a/b",
+    "a/b/",
+    "foo",
+    "x/foo",
+]
+
+
+def _assert_same_as_pathspec(patterns: list[str]):
+    """Check the compiled matcher excludes exactly the paths PathSpec does."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        spec = PathSpec.from_lines("gitwildmatch", patterns)
+    matcher = compile_gitwildmatch(patterns)
+    for path in PATHS:
+        assert bool(matcher.match(path)) == spec.match_file(path), (patterns, path)
+
+
+def test_directory_patterns_match_at_any_depth():
+    _assert_same_as_pathspec(["*/"])
+    _assert_same_as_pathspec(["**/"])
+    assert compile_gitwildmatch(["*/"]).match("d/e/")
+    assert not compile_gitwildmatch(["*/"]).match("top.py")
+
+
+def test_negated_directory_pattern():
+    # The usual whitelist .gitignore
+    _assert_same_as_pathspec(["*", "!*/", "!*.py"])
+    matcher = compile_gitwildmatch(["*", "!*/", "!*.py"])
+    assert not matcher.match("d/")
+    assert not matcher.match("top.py")
+    assert matcher.match("top.txt")
+
+
+def test_anchored_and_negated_patterns():
+    _assert_same_as_pathspec(["foo", "/a/b"])
+    _assert_same_as_pathspec(["*.txt", "!x.txt", "d/"])
+    _assert_same_as_pathspec(["**/x.py", "!d/"])
+
+
+def test_empty_pattern_list_matches_nothing():
+    assert not compile_gitwildmatch([]).match("top.py")
+    assert not compile_gitwildmatch(["# comment", ""]).match("top.py")
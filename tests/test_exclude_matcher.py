@@ -0,0 +1,23 @@
+"""Regression tests for ExcludeMatcher's handling of negated patterns."""
+
+from src.utils.exclude_matcher import ExcludeMatcher
+
+
+def test_negation_reincludes_suffix_match():
+    matcher = ExcludeMatcher(["*.txt", "!keep.txt"])
+    assert matcher.is_excluded("a.txt")
+    assert not matcher.is_excluded("keep.txt")
+    assert not matcher.is_excluded("d/keep.txt", parent_included=True)
+
+
+def test_negation_reincludes_name_and_glob_matches():
+    matcher = ExcludeMatcher(["build", "x*", "!build", "!xy.md"])
+    assert not matcher.is_excluded("build", is_dir=True)
+    assert not matcher.is_excluded("xy.md")
+    assert matcher.is_excluded("xz.md")
+
+
+def test_later_patterns_exclude_again():
+    matcher = ExcludeMatcher(["*.txt", "!keep.txt", "d/"])
+    assert matcher.is_excluded("d/keep.txt")
+    assert not matcher.is_excluded("keep.txt")